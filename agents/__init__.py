@@ -4,7 +4,6 @@ This file marks the 'agents' directory as a Python package so that
 relative imports (e.g., from .gemini_adapter import AIClient) work
 properly when modules are imported by orchestrator/main.
 """
-
 # Optional: expose common classes for convenience imports
 from .gig_hunter import GigHunterAgent  # noqa: F401
 from .product_factory import ProductFactoryAgent  # noqa: F401
@@ -13,3 +12,8 @@ from .outreach_agent import OutreachAgent  # noqa: F401
 from .fulfillment_agent import FulfillmentAgent  # noqa: F401
 from .code_writer import CodeWriterAgent  # noqa: F401
 from .code_reviewer import CodeReviewerAgent  # noqa: F401
+from . import _llm_cache, _logging, _queue_writer
+
+# Create the shared data directories once, rather than on every log/queue write
+for _data_dir in (_logging.LOG_DIR, _queue_writer.QUEUE_DIR, _llm_cache.CACHE_DIR):
+    _data_dir.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Base Agent - Shared plumbing for Lincoln Agency agents
+Part of Lincoln Agency multi-agent system
+
+Provides logging, queue output, status reporting and the event-driven
+continuous loop; concrete agents only implement their domain methods.
+"""
+import asyncio
+from .gemini_adapter import get_shared
+from ._hot import build_status, queue_path
+from . import _logging as agent_logging
+from . import _queue_writer as queue_writer
+
+
+class BaseAgent:
+    def __init__(self, name: str, queue_prefix: str):
+        self.name = name
+        self.queue_prefix = queue_prefix
+        self.status = "idle"
+        self.logger = agent_logging.get(self.name)
+        self.client = get_shared()
+        self._jobs = asyncio.Queue()
+        self._running_jobs = set()
+        self._loop_started = False
+
+    async def _save_to_queue(self, data):
+        """Save output to the queue system"""
+        await queue_writer.enqueue(queue_path(self.queue_prefix), data)
+
+    def submit(self, method: str, *args, **kwargs) -> asyncio.Future:
+        """Queue a job for the continuous loop and return a future for its result"""
+        future = asyncio.get_running_loop().create_future()
+        job = (method, args, kwargs, future)
+        if self._loop_started:
+            self._jobs.put_nowait(job)
+        else:
+            self._start_job(job)
+        return future
+
+    def _start_job(self, job):
+        task = asyncio.create_task(self._dispatch(job))
+        self._running_jobs.add(task)
+        task.add_done_callback(self._running_jobs.discard)
+
+    async def _dispatch(self, job):
+        method, args, kwargs, future = job
+        try:
+            result = await getattr(self, method)(*args, **kwargs)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+
+    async def run_continuously(self):
+        """Run the agent in continuous mode, waking only when a job is submitted"""
+        self.logger.info(f"{self.name} started in continuous mode")
+        self.status = "monitoring"
+        self._loop_started = True
+
+        try:
+            while True:
+                job = await self._jobs.get()
+                self._start_job(job)
+        finally:
+            self._loop_started = False
+
+    def get_status(self):
+        return build_status(self.name, self.status)
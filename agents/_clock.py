@@ -0,0 +1,25 @@
+"""
+Clock - Memoized timestamps for agent hot paths
+Part of Lincoln Agency multi-agent system
+
+Timestamps are formatted at most once per wall-clock second and shared by
+every caller within that second.
+"""
+import time
+from datetime import datetime
+
+# (epoch second, isoformat)
+_cache = (None, "")
+
+
+def _current():
+    global _cache
+    second = int(time.time())
+    if second != _cache[0]:
+        _cache = (second, datetime.fromtimestamp(second).isoformat())
+    return _cache
+
+
+def now_iso() -> str:
+    """Current local time as ISO 8601, at one-second resolution"""
+    return _current()[1]
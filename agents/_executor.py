@@ -0,0 +1,20 @@
+"""
+Executor - Shared worker pool for blocking agent work
+Part of Lincoln Agency multi-agent system
+
+asyncio.to_thread runs on the loop's default executor. install() replaces
+it with one named pool sized by LINCOLN_IO_WORKERS (default: 64), so email
+sends, queue batches and cache writes from every agent share the same
+workers instead of the small cpu-count-based default.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+IO_WORKERS = int(os.getenv("LINCOLN_IO_WORKERS", "64"))
+
+
+def install():
+    """Make the shared pool the running loop's default executor"""
+    executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="agent-io")
+    asyncio.get_running_loop().set_default_executor(executor)
@@ -0,0 +1,31 @@
+"""
+Hot Helpers - Per-task status and queue filename helpers
+Part of Lincoln Agency multi-agent system
+
+Kept free of async code and fully annotated so the module can be compiled
+in place with mypyc (mypyc agents/_hot.py); the plain Python version is
+used when no compiled extension is present.
+"""
+import itertools
+import time
+from ._clock import now_iso
+
+# Agent output directory; _queue_writer.QUEUE_DIR is derived from it
+QUEUE_DIR: str = "data/queue"
+
+# Breaks ties between files written in the same nanosecond
+_SEQ = itertools.count()
+
+
+def build_status(name: str, status: str) -> dict[str, str]:
+    """Status dict reported by every agent's get_status"""
+    return {
+        "name": name,
+        "status": status,
+        "last_active": now_iso()
+    }
+
+
+def queue_path(prefix: str) -> str:
+    """Unique queue filename for an agent output written now"""
+    return f"{QUEUE_DIR}/{prefix}_{time.time_ns()}_{next(_SEQ)}.json"
@@ -0,0 +1,65 @@
+"""
+HTTP - Shared async page fetching for agents
+Part of Lincoln Agency multi-agent system
+
+Pages are fetched over one pooled aiohttp session per event loop and
+reduced to plain text with selectolax when installed (pip install
+selectolax), otherwise with trafilatura on a worker thread.
+"""
+import asyncio
+import importlib.util
+import weakref
+import aiohttp
+
+FETCH_TIMEOUT = 10  # seconds
+CONNECTION_LIMIT = 100
+USER_AGENT = "Mozilla/5.0 (compatible; LincolnAgencyBot/1.0)"
+
+# event loop -> session
+_sessions = weakref.WeakKeyDictionary()
+
+
+def _session() -> aiohttp.ClientSession:
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=CONNECTION_LIMIT),
+            timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT),
+            headers={"User-Agent": USER_AGENT}
+        )
+        _sessions[loop] = session
+    return session
+
+
+def _extract_with_trafilatura(html: str) -> str:
+    import trafilatura
+    return trafilatura.extract(html) or ""
+
+
+async def html_to_text(html: str) -> str:
+    """Visible text of an HTML document"""
+    if importlib.util.find_spec("selectolax") is not None:
+        from selectolax.lexbor import LexborHTMLParser
+        tree = LexborHTMLParser(html)
+        if tree.body is None:
+            return ""
+        for node in tree.css("script, style, noscript"):
+            node.decompose()
+        return tree.body.text(separator=" ", strip=True)
+    return await asyncio.to_thread(_extract_with_trafilatura, html)
+
+
+async def fetch_text(url: str) -> str:
+    """Fetch a page and return its visible text"""
+    async with _session().get(url) as response:
+        response.raise_for_status()
+        html = await response.text()
+    return await html_to_text(html)
+
+
+async def close():
+    """Close the session for the running event loop (used on shutdown)"""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
@@ -0,0 +1,59 @@
+"""
+JSON Stream - Incremental extraction of array elements from streamed JSON
+Part of Lincoln Agency multi-agent system
+"""
+import json
+import re
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n,"
+
+
+class JsonArrayStream:
+    """
+    Feed streamed JSON text and get back each element of the array under
+    `field` as soon as it is complete, e.g. the `files` of a code project.
+    """
+
+    def __init__(self, field: str):
+        self._start = re.compile(r'"%s"\s*:\s*\[' % re.escape(field))
+        self._buffer = ""
+        self._pos = None
+        self.done = False
+
+    def feed(self, text: str) -> list:
+        """Append text and return any newly completed elements"""
+        self._buffer += text
+        if self.done:
+            return []
+
+        if self._pos is None:
+            match = self._start.search(self._buffer)
+            if not match:
+                return []
+            self._pos = match.end()
+        elif "}" not in text and "]" not in text:
+            # An element can only have completed if a closing bracket arrived
+            return []
+
+        elements = []
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos >= len(self._buffer):
+                break
+            if self._buffer[self._pos] == "]":
+                self.done = True
+                break
+            try:
+                element, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                break
+            elements.append(element)
+            self._pos = end
+
+        return elements
+
+    @property
+    def text(self) -> str:
+        return self._buffer
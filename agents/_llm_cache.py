@@ -0,0 +1,290 @@
+"""
+LLM Cache - Two-tier prompt cache for agent chat completions
+Part of Lincoln Agency multi-agent system
+
+Exact tier: SHA-256 of (model, messages, options) -> response text on disk.
+Semantic tier: prompt embedding compared by cosine similarity against
+previously cached prompts for the same model.
+
+Controlled by LLM_CACHE_MODE = off | exact | semantic (default: off, so
+every generation is fresh unless caching is switched on),
+LLM_CACHE_THRESHOLD (default: 0.97) for the semantic tier,
+LLM_CACHE_TTL in seconds (default: 86400; 0 means entries never expire;
+callers may pass their own ttl) and LLM_CACHE_MAX_ENTRIES (default: 10000;
+the oldest responses beyond it are deleted). Hit and miss counts are
+available from stats().
+"""
+import asyncio
+import hashlib
+import logging
+import math
+import operator
+import os
+import threading
+import time
+from pathlib import Path
+import orjson
+from . import _llm_dispatcher as llm_dispatcher
+
+CACHE_DIR = Path("data/cache/llm")
+SEMANTIC_INDEX = CACHE_DIR / "_semantic_index.jsonl"
+EMBEDDING_MODEL = "text-embedding-3-small"
+PRUNE_EVERY = 100  # stores between checks against LLM_CACHE_MAX_ENTRIES
+
+logger = logging.getLogger("LLMCache")
+
+# In-memory copy of the semantic index: list of (model, key, vector, norm)
+_semantic_entries = None
+_semantic_lock = threading.Lock()
+
+_stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+_puts = 0
+
+
+def cache_mode():
+    mode = os.getenv("LLM_CACHE_MODE", "off").lower()
+    return mode if mode in ("off", "exact", "semantic") else "off"
+
+
+def similarity_threshold():
+    return float(os.getenv("LLM_CACHE_THRESHOLD", "0.97"))
+
+
+def ttl_seconds():
+    return float(os.getenv("LLM_CACHE_TTL", "86400"))
+
+
+def max_entries():
+    return int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+
+def stats() -> dict:
+    """Cache hit/miss counters since startup"""
+    lookups = sum(_stats.values())
+    hits = _stats["exact_hits"] + _stats["semantic_hits"]
+    return dict(_stats, hit_rate=round(hits / lookups, 3) if lookups else 0.0)
+
+
+def make_key(model: str, messages: list, **options) -> str:
+    payload = model.encode() + b"|" + orjson.dumps(messages, option=orjson.OPT_SORT_KEYS)
+    if options:
+        payload += b"|" + orjson.dumps(options, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(payload).hexdigest()
+
+
+def get(key: str, ttl: float | None = None):
+    """Return the cached response text for key, or None on a miss"""
+    try:
+        entry = orjson.loads((CACHE_DIR / f"{key}.json").read_bytes())
+    except (OSError, ValueError):
+        return None
+
+    if ttl is None:
+        ttl = ttl_seconds()
+    if ttl and time.time() - entry.get("created", 0) > ttl:
+        return None
+    return entry.get("content")
+
+
+def put(key: str, model: str, content: str):
+    """Store response text for key"""
+    global _puts
+    entry = {"model": model, "content": content, "created": time.time()}
+    (CACHE_DIR / f"{key}.json").write_bytes(orjson.dumps(entry))
+
+    _puts += 1
+    if _puts % PRUNE_EVERY == 0:
+        prune()
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def prune(limit: int | None = None) -> int:
+    """Delete the oldest cached responses beyond limit (default: LLM_CACHE_MAX_ENTRIES)"""
+    if limit is None:
+        limit = max_entries()
+    files = list(CACHE_DIR.glob("*.json"))
+    if len(files) <= limit:
+        return 0
+
+    files.sort(key=_mtime)
+    removed = files[:len(files) - limit]
+    for path in removed:
+        path.unlink(missing_ok=True)
+
+    # Drop the semantic index entries of the deleted responses
+    removed_keys = {path.stem for path in removed}
+    with _semantic_lock:
+        if _semantic_entries is not None:
+            _semantic_entries[:] = [e for e in _semantic_entries if e[1] not in removed_keys]
+        try:
+            lines = SEMANTIC_INDEX.read_bytes().splitlines(keepends=True)
+        except OSError:
+            lines = []
+        if lines:
+            kept = []
+            for line in lines:
+                try:
+                    if orjson.loads(line)["key"] in removed_keys:
+                        continue
+                except (ValueError, KeyError):
+                    continue
+                kept.append(line)
+            tmp = SEMANTIC_INDEX.with_suffix(".tmp")
+            tmp.write_bytes(b"".join(kept))
+            os.replace(tmp, SEMANTIC_INDEX)
+
+    logger.info(f"Pruned {len(removed)} cached responses")
+    return len(removed)
+
+
+def _prompt_text(messages: list) -> str:
+    return "\n".join(str(m.get("content", "")) for m in messages)
+
+
+def _norm(vector):
+    return math.hypot(*vector)
+
+
+_sumprod = hasattr(math, "sumprod")
+
+
+def _dot(a, b):
+    # math.sumprod (Python 3.12+) runs the loop in C; map() keeps the
+    # fallback out of a generator frame
+    return math.sumprod(a, b) if _sumprod else sum(map(operator.mul, a, b))
+
+
+def _load_semantic_index():
+    global _semantic_entries
+    # Lookups and adds run on worker threads; load the index only once
+    with _semantic_lock:
+        if _semantic_entries is None:
+            entries = []
+            try:
+                with open(SEMANTIC_INDEX, 'rb') as f:
+                    for line in f:
+                        entry = orjson.loads(line)
+                        vector = entry["vector"]
+                        entries.append((entry["model"], entry["key"], vector, _norm(vector)))
+            except (OSError, ValueError, KeyError):
+                pass
+            _semantic_entries = entries
+    return _semantic_entries
+
+
+def _semantic_lookup(model: str, vector, ttl: float | None = None):
+    norm = _norm(vector)
+    if not norm:
+        return None
+
+    best_key, best_score = None, similarity_threshold()
+    for entry_model, key, other, other_norm in _load_semantic_index():
+        if entry_model != model or not other_norm:
+            continue
+        score = _dot(vector, other) / (norm * other_norm)
+        if score >= best_score:
+            best_key, best_score = key, score
+
+    return get(best_key, ttl) if best_key else None
+
+
+def _semantic_add(model: str, key: str, vector):
+    entries = _load_semantic_index()
+    # prune() rewrites the index under the same lock
+    with _semantic_lock:
+        with open(SEMANTIC_INDEX, 'ab') as f:
+            f.write(orjson.dumps({"model": model, "key": key, "vector": vector}) + b"\n")
+        entries.append((model, key, vector, _norm(vector)))
+
+
+def _embed(client, text: str):
+    response = client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+    return response.data[0].embedding
+
+
+async def get_or_compute(key: str, compute, model: str = "", prompt: str | None = None, embed=None, ttl: float | None = None):
+    """
+    Return cached response text for key, otherwise await compute() and cache it.
+
+    In semantic mode, `embed` (a sync callable text -> vector) and `prompt`
+    enable the similarity lookup on exact misses. `ttl` overrides
+    LLM_CACHE_TTL for this lookup.
+    """
+    mode = cache_mode()
+    if mode == "off":
+        return await compute()
+
+    cached = await asyncio.to_thread(get, key, ttl)
+    if cached is not None:
+        logger.info(f"Exact cache hit {key[:12]}")
+        _stats["exact_hits"] += 1
+        return cached
+
+    vector = None
+    if mode == "semantic" and embed and prompt:
+        try:
+            vector = await asyncio.to_thread(embed, prompt)
+            cached = await asyncio.to_thread(_semantic_lookup, model, vector, ttl)
+            if cached is not None:
+                logger.info(f"Semantic cache hit for {key[:12]}")
+                _stats["semantic_hits"] += 1
+                return cached
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {str(e)}")
+            vector = None
+
+    _stats["misses"] += 1
+    content = await compute()
+    if content:
+        await asyncio.to_thread(put, key, model, content)
+        if vector is not None:
+            await asyncio.to_thread(_semantic_add, model, key, vector)
+
+    return content
+
+
+async def cached_chat(client, model: str, messages: list, on_delta=None, transport=None, ttl: float | None = None, **options):
+    """
+    Cached drop-in for client.chat.completions.create returning the message text.
+
+    Misses are sent through the shared dispatcher, or through `transport`
+    (an async callable taking model, messages and options) when given;
+    `client` is only used for prompt embeddings in semantic mode. When
+    `on_delta` is given the response is streamed and each text delta is
+    passed to it as it arrives (a cache hit is delivered as a single delta).
+    `ttl` (seconds) overrides LLM_CACHE_TTL for this call.
+    """
+    key = make_key(model, messages, **options)
+    streamed = False
+
+    async def compute():
+        nonlocal streamed
+        if on_delta is None:
+            return await (transport or llm_dispatcher.submit)(model, messages, **options)
+
+        streamed = True
+        parts = []
+        async for delta in llm_dispatcher.stream(model, messages, **options):
+            parts.append(delta)
+            on_delta(delta)
+        return "".join(parts)
+
+    content = await get_or_compute(
+        key,
+        compute,
+        model=model,
+        prompt=_prompt_text(messages),
+        embed=lambda text: _embed(client, text),
+        ttl=ttl
+    )
+
+    if on_delta is not None and not streamed and content:
+        on_delta(content)
+
+    return content
@@ -0,0 +1,145 @@
+"""
+LLM Dispatcher - Shared async gateway for agent chat completions
+Part of Lincoln Agency multi-agent system
+
+Identical in-flight requests (same model, messages and options) share a
+single upstream call, and a semaphore caps concurrent provider requests
+(LLM_MAX_INFLIGHT, default: 8). Every agent's calls go through one
+AsyncOpenAI client so connections and TLS sessions are pooled instead of
+spawning a thread per request. With h2 installed (a project dependency)
+requests are multiplexed over HTTP/2; without it they fall back to
+HTTP/1.1 keep-alive.
+
+The client and semaphore are kept per event loop, since neither can be
+shared across loops. Rate-limited, dropped, timed-out and 5xx requests are
+retried with capped exponential backoff and jitter (LLM_MAX_RETRIES,
+default: 3); the SDK's own retries are disabled so this is the only retry
+policy. Requests to reasoning models (gpt-5, o-series) have max_tokens
+renamed to max_completion_tokens and temperature dropped, so callers can
+switch models without changing their options.
+"""
+import asyncio
+import importlib.util
+import logging
+import os
+import random
+import weakref
+import orjson
+from openai import (
+    APIConnectionError,
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    InternalServerError,
+    RateLimitError,
+)
+
+MAX_INFLIGHT = int(os.getenv("LLM_MAX_INFLIGHT", "8"))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+BACKOFF_BASE = 1.0  # seconds
+BACKOFF_MAX = 30.0  # seconds
+
+# Reasoning models reject max_tokens and any non-default temperature
+REASONING_MODEL_PREFIXES = ("gpt-5", "o1", "o3", "o4")
+
+# APITimeoutError is an APIConnectionError
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+logger = logging.getLogger("LLMDispatcher")
+
+# event loop -> (client, semaphore, in-flight requests by key)
+_sessions = weakref.WeakKeyDictionary()
+
+
+def _session():
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None:
+        http_client = DefaultAsyncHttpxClient(http2=importlib.util.find_spec("h2") is not None)
+        client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client, max_retries=0)
+        session = (client, asyncio.Semaphore(MAX_INFLIGHT), {})
+        _sessions[loop] = session
+    return session
+
+
+def get_client() -> AsyncOpenAI:
+    """The shared AsyncOpenAI client for the running event loop"""
+    return _session()[0]
+
+
+def backoff_delay(attempt: int) -> float:
+    """Seconds to wait before retry number attempt + 1"""
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) + random.uniform(0, BACKOFF_BASE)
+
+
+def model_options(model: str, options: dict) -> dict:
+    """Adapt request options to the model: reasoning models take
+    max_completion_tokens instead of max_tokens and no temperature"""
+    if not model.startswith(REASONING_MODEL_PREFIXES):
+        return options
+    options = {k: v for k, v in options.items() if k != "temperature"}
+    if "max_tokens" in options:
+        options["max_completion_tokens"] = options.pop("max_tokens")
+    return options
+
+
+async def _create(client: AsyncOpenAI, **kwargs):
+    kwargs = model_options(kwargs["model"], kwargs)
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return await client.chat.completions.create(**kwargs)
+        except RETRYABLE_ERRORS as e:
+            if attempt == MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning(f"{type(e).__name__}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+def log_prompt_cache(prompt_tokens: int, cached_tokens: int):
+    """Log how much of a prompt the provider served from its prefix cache"""
+    if prompt_tokens:
+        logger.debug(f"Prompt cache: {cached_tokens}/{prompt_tokens} prompt tokens cached")
+
+
+async def _call(model: str, messages: list, options: dict):
+    client, semaphore, _ = _session()
+    async with semaphore:
+        response = await _create(client, model=model, messages=messages, **options)
+    usage = response.usage
+    if usage is not None:
+        details = usage.prompt_tokens_details
+        cached = (details.cached_tokens or 0) if details else 0
+        log_prompt_cache(usage.prompt_tokens, cached)
+    return response.choices[0].message.content
+
+
+async def submit(model: str, messages: list, **options):
+    """Run a chat completion and return the message text, coalescing duplicates"""
+    key = orjson.dumps([model, messages, options], option=orjson.OPT_SORT_KEYS)
+
+    pending = _session()[2]
+    task = pending.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_call(model, messages, options))
+        pending[key] = task
+        task.add_done_callback(lambda _: pending.pop(key, None))
+
+    # Shield so one cancelled caller does not cancel the shared request
+    return await asyncio.shield(task)
+
+
+async def stream(model: str, messages: list, **options):
+    """Run a streaming chat completion, yielding text deltas as they arrive"""
+    client, semaphore, _ = _session()
+    async with semaphore:
+        response = await _create(client, model=model, messages=messages, stream=True, **options)
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+async def close():
+    """Close the client for the running event loop (used on shutdown)"""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session[0].close()
@@ -0,0 +1,61 @@
+"""
+Local LLM - Quantized on-box chat model for short content generation
+Part of Lincoln Agency multi-agent system
+
+Wraps a llama.cpp model (pip install llama-cpp-python) loaded once from the
+GGUF file at LOCAL_MODEL_PATH, ideally a Q8_0 quantization of a 7-8B chat
+model. Responses go through the same exact-match prompt cache as hosted
+calls, so only cache misses reach the model.
+"""
+import asyncio
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from . import _llm_cache as llm_cache
+
+N_CTX = 4096
+
+# llama.cpp contexts are not thread-safe; generations run one at a time
+_lock = threading.Lock()
+
+
+def model_path() -> str:
+    path = os.getenv("LOCAL_MODEL_PATH", "")
+    if not path:
+        raise ValueError("LOCAL_MODEL_PATH must point to a GGUF model file")
+    return path
+
+
+@lru_cache(maxsize=1)
+def get_model():
+    """Load the local model on first use"""
+    try:
+        from llama_cpp import Llama
+    except ImportError as e:
+        raise ImportError("llama-cpp-python is required for the local backend. Install it with: pip install llama-cpp-python") from e
+
+    return Llama(
+        model_path=model_path(),
+        n_ctx=N_CTX,
+        n_threads=os.cpu_count(),
+        logits_all=False,
+        verbose=False
+    )
+
+
+def _complete(messages: list, **options) -> str:
+    with _lock:
+        response = get_model().create_chat_completion(messages=messages, **options)
+    return response["choices"][0]["message"]["content"]
+
+
+async def cached_chat(messages: list, **options) -> str:
+    """Chat completion text from the local model, served from the cache when possible"""
+    model = f"local:{Path(model_path()).name}"
+    key = llm_cache.make_key(model, messages, **options)
+
+    async def compute():
+        return await asyncio.to_thread(_complete, messages, **options)
+
+    return await llm_cache.get_or_compute(key, compute, model=model)
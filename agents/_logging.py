@@ -0,0 +1,84 @@
+"""
+Agent Logging - Non-blocking per-agent log files
+Part of Lincoln Agency multi-agent system
+
+Agent loggers only enqueue records; one background QueueListener thread
+writes them to data/logs/<agent name>.log. Each file sits behind a
+MemoryHandler that holds up to LOG_BUFFER_RECORDS records and writes them
+together, so routine records can reach the file late; an ERROR record
+flushes the buffer at once, and everything left is flushed on exit. Each
+file rolls over at LOG_MAX_BYTES, keeping LOG_BACKUP_COUNT old copies
+(<agent name>.log.1 ...).
+"""
+import atexit
+import logging
+import queue
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+
+LOG_DIR = Path("data/logs")
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_BUFFER_RECORDS = 100
+LOG_MAX_BYTES = 10_000_000
+LOG_BACKUP_COUNT = 5
+
+_queue = queue.SimpleQueue()
+_listener = None
+_router = None
+
+
+class _PerLoggerFileHandler(logging.Handler):
+    """Route each record to the log file named after its logger"""
+
+    def __init__(self):
+        super().__init__()
+        self._handlers = {}
+
+    def emit(self, record):
+        handler = self._handlers.get(record.name)
+        if handler is None:
+            file_handler = RotatingFileHandler(
+                LOG_DIR / f"{record.name.lower()}.log",
+                maxBytes=LOG_MAX_BYTES,
+                backupCount=LOG_BACKUP_COUNT,
+                delay=True
+            )
+            file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            handler = MemoryHandler(LOG_BUFFER_RECORDS, flushLevel=logging.ERROR, target=file_handler)
+            self._handlers[record.name] = handler
+        handler.handle(record)
+
+    def close(self):
+        # logging.shutdown closes this again after the listener stops
+        handlers, self._handlers = self._handlers, {}
+        for handler in handlers.values():
+            target = handler.target
+            handler.close()  # flushes buffered records to the file
+            target.close()
+        super().close()
+
+
+def _stop_listener():
+    _listener.stop()
+    _router.close()
+
+
+def _start_listener():
+    global _listener, _router
+    if _listener is None:
+        _router = _PerLoggerFileHandler()
+        _listener = QueueListener(_queue, _router)
+        _listener.start()
+        atexit.register(_stop_listener)
+
+
+def get(name: str) -> logging.Logger:
+    """Return the logger for an agent, attaching the queue handler once"""
+    _start_listener()
+
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    if not any(isinstance(h, QueueHandler) for h in logger.handlers):
+        logger.addHandler(QueueHandler(_queue))
+
+    return logger
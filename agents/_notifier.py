@@ -0,0 +1,49 @@
+"""
+Notifier - Fire-and-forget task emails for agents
+Part of Lincoln Agency multi-agent system
+
+Agents enqueue notifications and return immediately; a single background
+task sends them through send_task_email on a worker thread.
+"""
+import asyncio
+import logging
+from .email_notifier import send_task_email
+
+logger = logging.getLogger("Notifier")
+
+_queue = None
+_worker = None
+
+
+async def _drain_queue():
+    while True:
+        agent_name, task_description, result = await _queue.get()
+        try:
+            await asyncio.to_thread(send_task_email, agent_name, task_description, result)
+        except Exception as e:
+            logger.error(f"Error sending notification for {agent_name}: {str(e)}")
+        finally:
+            _queue.task_done()
+
+
+def _ensure_worker():
+    global _queue, _worker
+    if _worker is None or _worker.done():
+        _queue = asyncio.Queue()
+        _worker = asyncio.create_task(_drain_queue(), name="notifier")
+
+
+async def enqueue(agent_name: str, task_description: str, result: str):
+    """Schedule a task-completion email without waiting for it to be sent"""
+    _ensure_worker()
+    _queue.put_nowait((agent_name, task_description, result))
+
+
+async def drain(timeout: float | None = None):
+    """Wait for pending notifications to be sent (used on shutdown)"""
+    if _queue is None:
+        return
+    try:
+        await asyncio.wait_for(_queue.join(), timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"{_queue.qsize()} notifications still pending at shutdown")
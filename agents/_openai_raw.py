@@ -0,0 +1,80 @@
+"""
+OpenAI Raw - Direct aiohttp chat completions for high-fanout paths
+Part of Lincoln Agency multi-agent system
+
+Posts straight to /v1/chat/completions over one pooled aiohttp session per
+event loop, skipping the SDK's per-request overhead. Requires
+OPENAI_API_KEY; without it chat() raises before sending anything.
+"""
+import asyncio
+import logging
+import os
+import weakref
+import aiohttp
+import orjson
+from . import _llm_dispatcher as llm_dispatcher
+
+API_URL = "https://api.openai.com/v1/chat/completions"
+CONNECTION_LIMIT = 200
+DNS_CACHE_TTL = 300  # seconds
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+logger = logging.getLogger("LLMDispatcher")
+
+# event loop -> (session, semaphore)
+_sessions = weakref.WeakKeyDictionary()
+
+
+def _session():
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session[0].closed:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY is not set")
+        client = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=CONNECTION_LIMIT, ttl_dns_cache=DNS_CACHE_TTL),
+            headers={"Authorization": f"Bearer {api_key}"},
+            json_serialize=lambda obj: orjson.dumps(obj).decode()
+        )
+        session = (client, asyncio.Semaphore(llm_dispatcher.MAX_INFLIGHT))
+        _sessions[loop] = session
+    return session
+
+
+async def chat(model: str, messages: list, **options) -> str:
+    """Run a chat completion and return the message text"""
+    client, semaphore = _session()
+    payload = dict(llm_dispatcher.model_options(model, options), model=model, messages=messages)
+
+    async with semaphore:
+        for attempt in range(llm_dispatcher.MAX_RETRIES + 1):
+            last_attempt = attempt == llm_dispatcher.MAX_RETRIES
+            try:
+                async with client.post(API_URL, json=payload) as response:
+                    if response.status in RETRY_STATUSES and not last_attempt:
+                        reason = f"HTTP {response.status}"
+                    else:
+                        response.raise_for_status()
+                        body = orjson.loads(await response.read())
+                        usage = body.get("usage") or {}
+                        llm_dispatcher.log_prompt_cache(
+                            usage.get("prompt_tokens", 0),
+                            (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+                        )
+                        return body["choices"][0]["message"]["content"]
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if last_attempt:
+                    raise
+                reason = type(e).__name__
+
+            delay = llm_dispatcher.backoff_delay(attempt)
+            logger.warning(f"{reason}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+async def close():
+    """Close the session for the running event loop (used on shutdown)"""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session[0].close()
@@ -0,0 +1,228 @@
+"""
+Queue Writer - Batched background writes for agent queue files
+Part of Lincoln Agency multi-agent system
+
+Agents enqueue (path, data) and return immediately; a single background
+task collects up to BATCH_SIZE items or FLUSH_INTERVAL seconds of writes
+and serializes them off the event loop. Values may be orjson.Fragment
+(already-encoded JSON), which is written as-is. Set QUEUE_PRETTY_JSON=1 to
+indent queue files for debugging.
+
+LINCOLN_QUEUE_FORMAT=msgpack (requires msgspec) writes compact .msgpack
+files instead, each with a small .meta.json sidecar for humans.
+
+LINCOLN_QUEUE_FORMAT=jsonl appends every record as one line to a daily
+data/queue/stream-YYYYMMDD.jsonl, opened once with O_APPEND behind a large
+buffer and flushed after each batch.
+
+LINCOLN_QUEUE_IO=uring submits each batch of .json files through io_uring
+(Linux 5.1+, pip install liburing), falling back to regular writes when
+it is unavailable.
+
+Paths ending in .ndjson are append-only logs in every format: each record
+is added to the file as one line instead of creating a file of its own.
+"""
+import asyncio
+import io
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+import orjson
+from . import _hot as hot
+from . import _uring_writer as uring_writer
+
+BATCH_SIZE = 100
+FLUSH_INTERVAL = 0.05  # seconds
+
+QUEUE_FORMAT = os.getenv("LINCOLN_QUEUE_FORMAT", "json").lower()
+QUEUE_IO = os.getenv("LINCOLN_QUEUE_IO", "").lower()
+QUEUE_DIR = Path(hot.QUEUE_DIR)  # where queue_path() names agent outputs
+STREAM_BUFFER_SIZE = 1 << 20
+APPEND_SUFFIX = ".ndjson"
+
+logger = logging.getLogger("QueueWriter")
+
+_queue = None
+_worker = None
+_stream = None  # (day, buffered writer) for the jsonl format
+
+
+def _msgpack():
+    try:
+        import msgspec
+    except ImportError as e:
+        raise ImportError("msgspec is required for LINCOLN_QUEUE_FORMAT=msgpack. Install it with: pip install msgspec") from e
+    return msgspec.msgpack
+
+
+if QUEUE_FORMAT == "msgpack":
+    _msgpack()  # fail at startup rather than on the first write
+
+
+def _dump_options():
+    return orjson.OPT_INDENT_2 if os.getenv("QUEUE_PRETTY_JSON") else 0
+
+
+def _msgpack_default(obj):
+    if isinstance(obj, orjson.Fragment):
+        return orjson.loads(obj.contents)
+    raise NotImplementedError(f"Cannot encode {type(obj).__name__}")
+
+
+def _write_msgpack(path: Path, data):
+    path.write_bytes(_msgpack().encode(data, enc_hook=_msgpack_default))
+    meta = {"file": path.name}
+    if isinstance(data, dict):
+        meta.update({k: data[k] for k in ("agent", "type", "timestamp") if k in data})
+    path.with_suffix(".meta.json").write_bytes(orjson.dumps(meta))
+
+
+def _stream_writer():
+    """Return the append-only writer for today's stream file, rolling daily"""
+    global _stream
+    day = datetime.now().strftime('%Y%m%d')
+    if _stream is None or _stream[0] != day:
+        if _stream is not None:
+            _stream[1].close()
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_CLOEXEC", 0)
+        fd = os.open(QUEUE_DIR / f"stream-{day}.jsonl", flags, 0o644)
+        _stream = (day, io.BufferedWriter(io.FileIO(fd, 'wb'), buffer_size=STREAM_BUFFER_SIZE))
+    return _stream[1]
+
+
+def _append_batch(batch):
+    writer = _stream_writer()
+    for path, data in batch:
+        try:
+            writer.write(orjson.dumps(data) + b"\n")
+        except Exception as e:
+            logger.error(f"Error appending queue record for {path.name}: {str(e)}")
+    writer.flush()
+
+
+def _append_logs(records):
+    """Append records to their .ndjson logs, opening each log once per batch"""
+    lines = {}
+    for path, data in records:
+        try:
+            lines.setdefault(path, []).append(orjson.dumps(data) + b"\n")
+        except Exception as e:
+            logger.error(f"Error encoding log record for {path.name}: {str(e)}")
+
+    for path, chunks in lines.items():
+        try:
+            with open(path, 'ab') as f:
+                f.write(b"".join(chunks))
+        except Exception as e:
+            logger.error(f"Error appending to {path}: {str(e)}")
+
+
+def _write_batch_uring(batch, options):
+    """Write the .json part of a batch via io_uring; return what is left to write"""
+    remaining, payloads = [], {}
+    for path, data in batch:
+        if path.suffix != ".json":
+            remaining.append((path, data))
+            continue
+        try:
+            # the last write to a path wins, as with sequential writes
+            payloads[path] = orjson.dumps(data, option=options)
+        except Exception as e:
+            logger.error(f"Error writing queue file {path}: {str(e)}")
+
+    items = list(payloads.items())
+    try:
+        failed = set(uring_writer.write_files(items))
+    except Exception as e:
+        logger.error(f"io_uring batch write failed, retrying with regular writes: {str(e)}")
+        failed = {path for path, _ in items}
+
+    data_by_path = dict(batch)
+    remaining.extend((path, data_by_path[path]) for path in failed)
+    return remaining
+
+
+def _write_batch(batch):
+    logs = [item for item in batch if item[0].suffix == APPEND_SUFFIX]
+    if logs:
+        _append_logs(logs)
+        batch = [item for item in batch if item[0].suffix != APPEND_SUFFIX]
+        if not batch:
+            return
+
+    if QUEUE_FORMAT == "jsonl":
+        _append_batch(batch)
+        return
+
+    options = _dump_options()
+    if QUEUE_IO == "uring" and uring_writer.available():
+        batch = _write_batch_uring(batch, options)
+
+    for path, data in batch:
+        try:
+            if path.suffix == ".msgpack":
+                _write_msgpack(path, data)
+            else:
+                path.write_bytes(orjson.dumps(data, option=options))
+        except Exception as e:
+            logger.error(f"Error writing queue file {path}: {str(e)}")
+
+
+def load(path):
+    """Read a queue file written in any format (a .jsonl stream yields a list)"""
+    path = Path(path)
+    if path.suffix == ".jsonl":
+        return [orjson.loads(line) for line in path.read_bytes().splitlines() if line]
+    if path.suffix == ".msgpack":
+        return _msgpack().decode(path.read_bytes())
+    return orjson.loads(path.read_bytes())
+
+
+async def _drain():
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await _queue.get()]
+        deadline = loop.time() + FLUSH_INTERVAL
+
+        while len(batch) < BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        # A failed batch must not kill the worker, or the writes still
+        # queued behind it would be dropped when it is restarted
+        try:
+            await asyncio.to_thread(_write_batch, batch)
+        except Exception as e:
+            logger.error(f"Error writing queue batch of {len(batch)}: {str(e)}")
+        finally:
+            for _ in batch:
+                _queue.task_done()
+
+
+def _ensure_worker():
+    global _queue, _worker
+    if _worker is None or _worker.done():
+        _queue = asyncio.Queue()
+        _worker = asyncio.create_task(_drain(), name="queue_writer")
+
+
+async def enqueue(path, data):
+    """Schedule data to be written to path in the configured queue format"""
+    path = Path(path)
+    if QUEUE_FORMAT == "msgpack" and path.suffix != APPEND_SUFFIX:
+        path = path.with_suffix(".msgpack")
+
+    _ensure_worker()
+    _queue.put_nowait((path, data))
+
+
+async def flush():
+    """Wait until every enqueued write has reached disk"""
+    if _queue is not None:
+        await _queue.join()
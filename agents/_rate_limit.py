@@ -0,0 +1,33 @@
+"""
+Rate Limit - Async token bucket for provider request pacing
+Part of Lincoln Agency multi-agent system
+
+Allows bursts of up to `per_minute` units (requests or tokens) and refills
+continuously, so callers wait only when they actually exceed the budget.
+"""
+import asyncio
+import time
+
+
+class TokenBucket:
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0  # tokens per second
+        self._tokens = float(per_minute)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1):
+        """Wait until `amount` units are available and take them"""
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self._tokens < amount:
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= amount
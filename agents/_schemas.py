@@ -0,0 +1,96 @@
+"""
+Schemas - JSON schemas for structured AI responses
+Part of Lincoln Agency multi-agent system
+
+Each schema is compiled once at import with fastjsonschema into a
+straight-line validator. A validator returns the parsed response with
+defaults filled in for optional fields and raises
+fastjsonschema.JsonSchemaException (a ValueError) on malformed output.
+"""
+import fastjsonschema
+
+
+def _string(default=None) -> dict:
+    schema = {"type": "string"}
+    if default is not None:
+        schema["default"] = default
+    return schema
+
+
+def _trend_results(opportunity_properties: dict) -> dict:
+    return {
+        "type": "object",
+        "required": ["results"],
+        "properties": {
+            "results": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "required": ["url"],
+                    "properties": {
+                        "url": {"type": "string"},
+                        "opportunities": {
+                            "type": "array",
+                            "default": [],
+                            "items": {"type": "object", "properties": opportunity_properties}
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+
+FIVERR_TRENDS = _trend_results({
+    "title": _string("Service Opportunity"),
+    "description": _string(""),
+    "estimated_value": {"default": "$50-500"},
+    "market_demand": {"default": "medium"}
+})
+
+GUMROAD_TRENDS = _trend_results({
+    "title": _string("Digital Product Opportunity"),
+    "description": _string(""),
+    "target_audience": {"default": "Business professionals"},
+    "estimated_price": {"default": "$20-100"}
+})
+
+PROPOSAL = {
+    "type": "object",
+    "required": ["title", "introduction", "approach", "timeline", "pricing_notes", "closing"]
+}
+
+PERSONALIZED_EMAIL = {
+    "type": "object",
+    "required": ["subject", "personalized_email"],
+    "properties": {
+        "subject": _string(),
+        "personalized_email": _string()
+    }
+}
+
+EBOOK_OUTLINE = {
+    "type": "object",
+    "required": ["title", "chapters"],
+    "properties": {
+        "title": _string(),
+        "description": _string(""),
+        "chapters": {"type": "array", "minItems": 1, "items": {"type": "object"}}
+    }
+}
+
+TEMPLATE = {
+    "type": "object",
+    "required": ["title", "sections"],
+    "properties": {
+        "title": _string(),
+        "sections": {"type": "array"}
+    }
+}
+
+validate_fiverr_trends = fastjsonschema.compile(FIVERR_TRENDS)
+validate_gumroad_trends = fastjsonschema.compile(GUMROAD_TRENDS)
+validate_proposal = fastjsonschema.compile(PROPOSAL)
+validate_personalized_email = fastjsonschema.compile(PERSONALIZED_EMAIL)
+validate_ebook_outline = fastjsonschema.compile(EBOOK_OUTLINE)
+validate_template = fastjsonschema.compile(TEMPLATE)
@@ -0,0 +1,111 @@
+"""
+Uring Writer - Optional io_uring backend for queue file batches
+Part of Lincoln Agency multi-agent system
+
+Writes a whole batch of queue files with one io_uring submission per
+SUBMIT_BATCH files instead of one write syscall each. Requires Linux 5.1+
+and the liburing bindings (pip install liburing); callers should check
+available() and keep their regular write path as the fallback.
+"""
+import logging
+import os
+import platform
+import threading
+
+RING_ENTRIES = 256
+SUBMIT_BATCH = 64
+
+logger = logging.getLogger("QueueWriter")
+
+_ring = None
+_lock = threading.Lock()
+_available = None
+
+
+def _kernel_supported() -> bool:
+    if platform.system() != "Linux":
+        return False
+    try:
+        major, minor = (int(part) for part in platform.release().split(".")[:2])
+    except ValueError:
+        return False
+    return (major, minor) >= (5, 1)
+
+
+def available() -> bool:
+    """True when liburing imports and the kernel supports io_uring"""
+    global _available
+    if _available is None:
+        _available = False
+        if _kernel_supported():
+            try:
+                import liburing  # noqa: F401
+                _available = True
+            except ImportError:
+                logger.warning("liburing is not installed, using regular queue writes. Install it with: pip install liburing")
+    return _available
+
+
+def _get_ring():
+    global _ring
+    if _ring is None:
+        import liburing
+        ring = liburing.Ring()
+        liburing.io_uring_queue_init(RING_ENTRIES, ring, 0)
+        _ring = ring
+    return _ring
+
+
+def _submit(liburing, ring, group):
+    """Write one group of (path, fd, payload) and return the paths that failed"""
+    for index, (_, fd, payload) in enumerate(group):
+        sqe = liburing.io_uring_get_sqe(ring)
+        liburing.io_uring_prep_write(sqe, fd, payload, 0)
+        liburing.io_uring_sqe_set_data64(sqe, index)
+
+    liburing.io_uring_submit_and_wait(ring, len(group))
+
+    failed = []
+    cqe = liburing.Cqe()
+    seen = 0
+    while seen < len(group):
+        liburing.io_uring_wait_cqe(ring, cqe)
+        ready = liburing.io_uring_cq_ready(ring)
+        for i in range(ready):
+            entry = cqe[i]
+            path, _, payload = group[entry.user_data]
+            if entry.res != len(payload):
+                failed.append(path)
+        liburing.io_uring_cq_advance(ring, ready)
+        seen += ready
+    return failed
+
+
+def write_files(items):
+    """Write each (path, bytes) pair, truncating existing files
+
+    Returns the paths whose write failed or came back short so the caller
+    can retry them through the regular path.
+    """
+    import liburing
+
+    failed = []
+    with _lock:
+        ring = _get_ring()
+        for start in range(0, len(items), SUBMIT_BATCH):
+            group = []
+            try:
+                for path, payload in items[start:start + SUBMIT_BATCH]:
+                    try:
+                        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0), 0o644)
+                    except OSError as e:
+                        logger.error(f"Error opening queue file {path}: {str(e)}")
+                        failed.append(path)
+                        continue
+                    group.append((path, fd, payload))
+                if group:
+                    failed.extend(_submit(liburing, ring, group))
+            finally:
+                for _, fd, _ in group:
+                    os.close(fd)
+    return failed
@@ -4,90 +4,132 @@ Code Reviewer Agent - Reviews and improves generated code quality
 Part of Lincoln Agency multi-agent system
 """
 import asyncio
-import json
-import logging
-from datetime import datetime
-from pathlib import Path
-import os
-from .email_notifier import send_task_email
-from .gemini_adapter import AIClient
-
-class CodeReviewerAgent:
+from functools import lru_cache
+import orjson
+from . import _llm_cache as llm_cache
+from . import _notifier as notifier
+from ._base import BaseAgent
+from ._clock import now_iso
+from ._json_stream import JsonArrayStream
+
+DEFAULT_CRITERIA = (
+    "code quality and readability",
+    "security vulnerabilities",
+    "performance optimizations",
+    "error handling",
+    "best practices compliance",
+    "documentation quality"
+)
+DEFAULT_CRITERIA_TEXT = ', '.join(DEFAULT_CRITERIA)
+
+# Prompt template is built once at import and filled per call
+REVIEW_PROMPT = """
+Perform a comprehensive code review for this {language} code:
+
+Code to Review:
+```{language}
+{code_content}
+```
+
+Review Criteria: {criteria}
+
+Provide detailed analysis including:
+1. Overall code quality assessment (1-10 score)
+2. Specific issues found with line references
+3. Security concerns or vulnerabilities
+4. Performance improvement suggestions
+5. Code style and best practices feedback
+6. Suggested improvements with code examples
+7. Testing recommendations
+
+Format as JSON with: overall_score, issues (array), security_concerns, performance_suggestions, improvements, testing_recommendations
+"""
+
+# Inputs above MAX_INPUT_TOKENS are split into CHUNK_TOKENS windows that
+# overlap by CHUNK_OVERLAP tokens and reviewed in parallel
+MAX_INPUT_TOKENS = 6000
+CHUNK_TOKENS = 5000
+CHUNK_OVERLAP = 500
+CHARS_PER_TOKEN = 4  # estimate used when tiktoken is not installed
+
+
+@lru_cache(maxsize=None)
+def _encoder():
+    try:
+        import tiktoken
+        return tiktoken.encoding_for_model("gpt-4o-mini")
+    except Exception:
+        return None
+
+
+def _split_code(code_content: str) -> list:
+    """Split code into overlapping token windows, or return it whole if small enough"""
+    encoder = _encoder()
+    if encoder is not None:
+        units, join, scale = encoder.encode(code_content), encoder.decode, 1
+    else:
+        units, join, scale = code_content, str, CHARS_PER_TOKEN
+
+    if len(units) <= MAX_INPUT_TOKENS * scale:
+        return [code_content]
+
+    size = CHUNK_TOKENS * scale
+    step = (CHUNK_TOKENS - CHUNK_OVERLAP) * scale
+    return [join(units[i:i + size]) for i in range(0, len(units) - CHUNK_OVERLAP * scale, step)]
+
+
+def _merge_reviews(reviews: list) -> dict:
+    """Combine per-chunk reviews: concatenate findings and average the score"""
+    merged = {}
+    scores = []
+    for review in reviews:
+        for key, value in review.items():
+            if key == "overall_score":
+                if isinstance(value, (int, float)):
+                    scores.append(value)
+                continue
+            items = value if isinstance(value, list) else [value]
+            merged.setdefault(key, []).extend(items)
+
+    if scores:
+        merged["overall_score"] = round(sum(scores) / len(scores), 1)
+    return merged
+
+
+class CodeReviewerAgent(BaseAgent):
     def __init__(self):
-        self.name = "CodeReviewer"
-        self.status = "idle"
-        self.logger = self._setup_logging()
-        self.client = AIClient()
-
-    def _setup_logging(self):
-        logger = logging.getLogger(self.name)
-        logger.setLevel(logging.INFO)
-        
-        Path("data/logs").mkdir(parents=True, exist_ok=True)
-        
-        handler = logging.FileHandler(f"data/logs/{self.name.lower()}.log")
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        
-        return logger
-        
+        super().__init__("CodeReviewer", "code_reviewer")
+
     async def review_code(self, code_content: str, language: str, review_criteria: list | None = None):
         """Review code and provide detailed feedback and improvements"""
         self.status = "working"
         self.logger.info(f"Reviewing {language} code")
         
         try:
-            default_criteria = [
-                "code quality and readability",
-                "security vulnerabilities",
-                "performance optimizations", 
-                "error handling",
-                "best practices compliance",
-                "documentation quality"
-            ]
-            
-            criteria = review_criteria or default_criteria
-            
-            prompt = f"""
-            Perform a comprehensive code review for this {language} code:
-            
-            Code to Review:
-            ```{language}
-            {code_content}
-            ```
+            if review_criteria:
+                criteria = review_criteria
+                criteria_text = ', '.join(criteria)
+            else:
+                criteria = DEFAULT_CRITERIA
+                criteria_text = DEFAULT_CRITERIA_TEXT
             
-            Review Criteria: {', '.join(criteria)}
-            
-            Provide detailed analysis including:
-            1. Overall code quality assessment (1-10 score)
-            2. Specific issues found with line references
-            3. Security concerns or vulnerabilities
-            4. Performance improvement suggestions
-            5. Code style and best practices feedback
-            6. Suggested improvements with code examples
-            7. Testing recommendations
-            
-            Format as JSON with: overall_score, issues (array), security_concerns, performance_suggestions, improvements, testing_recommendations
-            """
-            
-            # Use the correct client instance
-            response = await asyncio.to_thread(
-                self.client.client.chat.completions.create,  # Fixed client reference
-                model="gpt-4o-mini",  # Using available model
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"}
-            )
-            
-            content_text = response.choices[0].message.content
-            if not content_text:
-                raise ValueError("No code review content received from AI")
-            review_result = json.loads(content_text)
+            chunks = _split_code(code_content)
+            if len(chunks) == 1:
+                content_text = await self._review_chunk(code_content, language, criteria_text)
+                review_result = orjson.loads(content_text)
+            else:
+                # Large inputs are reviewed as overlapping chunks in parallel
+                self.logger.info(f"Reviewing code in {len(chunks)} chunks")
+                chunk_texts = await asyncio.gather(
+                    *(self._review_chunk(chunk, language, criteria_text) for chunk in chunks)
+                )
+                review_result = _merge_reviews([orjson.loads(text) for text in chunk_texts])
+                content_text = orjson.dumps(review_result).decode()
             
             output_data = {
                 "agent": self.name,
                 "type": "code_review",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso(),
                 "language": language,
                 "review_criteria": criteria,
                 "review": review_result
@@ -98,10 +140,10 @@ class CodeReviewerAgent:
             self.status = "idle"
 
             # 📧 Send email after task completion
-            send_task_email(
+            await notifier.enqueue(
                 self.name,
                 f"Reviewed {language} code",
-                json.dumps(review_result, indent=2)
+                content_text
             )
 
             return review_result
@@ -110,31 +152,36 @@ class CodeReviewerAgent:
             self.logger.error(f"Error reviewing code: {str(e)}")
             self.status = "error"
             raise
-    
-    async def _save_to_queue(self, data):
-        """Save output to the queue system"""
-        Path("data/queue").mkdir(parents=True, exist_ok=True)
-        filename = f"data/queue/code_reviewer_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+    async def _review_chunk(self, code_content: str, language: str, criteria_text: str) -> str:
+        """Review a single piece of code and return the model's JSON text"""
+        prompt = REVIEW_PROMPT.format(
+            language=language,
+            code_content=code_content,
+            criteria=criteria_text
+        )
+        
+        # Stream the response so issues are decoded as they are generated
+        issues_stream = JsonArrayStream("issues")
+        issue_count = 0
+
+        def on_delta(delta):
+            nonlocal issue_count
+            issue_count += len(issues_stream.feed(delta))
+
+        content_text = await llm_cache.cached_chat(
+            self.client.client,
+            model="gpt-4o-mini",  # Using available model
+            messages=[{"role": "user", "content": prompt}],
+            response_format={"type": "json_object"},
+            max_tokens=1500,
+            temperature=0,
+            seed=0,
+            on_delta=on_delta
+        )
         
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
-    
-    async def run_continuously(self):
-        """Run the agent in continuous mode"""
-        self.logger.info("CodeReviewer started in continuous mode")
+        if not content_text:
+            raise ValueError("No code review content received from AI")
+        self.logger.info(f"Streamed {issue_count} review issues")
         
-        while True:
-            try:
-                self.status = "monitoring"
-                await asyncio.sleep(80)
-                
-            except Exception as e:
-                self.logger.error(f"Error in continuous mode: {str(e)}")
-                await asyncio.sleep(25)
-    
-    def get_status(self):
-        return {
-            "name": self.name,
-            "status": self.status,
-            "last_active": datetime.now().isoformat()
-        }
\ No newline at end of file
+        return content_text
@@ -3,73 +3,81 @@
 Code Writer Agent - Generates working code projects from specifications
 Part of Lincoln Agency multi-agent system
 """
-import asyncio
-import json
-import logging
-from datetime import datetime
-from pathlib import Path
 import os
-from .gemini_adapter import AIClient
-from .email_notifier import send_task_email
+import orjson
+from . import _llm_cache as llm_cache
+from . import _notifier as notifier
+from ._base import BaseAgent
+from ._clock import now_iso
+from ._json_stream import JsonArrayStream
 
-class CodeWriterAgent:
+# Hosted model for code generation (e.g. LLM_MODEL=gpt-5)
+MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+
+# Prompt templates are built once at import and filled per call; the static
+# instructions lead so the provider can cache the shared prefix
+CODE_PROJECT_SYSTEM = """
+Generate a complete code project in the language and to the specifications given by the user.
+
+Requirements:
+1. Create a well-structured project with proper file organization
+2. Include all necessary files (main code, config, requirements, etc.)
+3. Write clean, documented, and production-ready code
+4. Include error handling and validation
+5. Add appropriate comments and docstrings
+6. Follow best practices for the chosen language
+
+Format as JSON with: project_structure, files (array with filename, content, description), setup_instructions, usage_examples
+"""
+
+CODE_PROJECT_INPUT = """
+Language: {language}
+Project Specifications: {project_spec}
+"""
+
+class CodeWriterAgent(BaseAgent):
     def __init__(self):
-        self.name = "CodeWriter"
-        self.status = "idle"
-        self.logger = self._setup_logging()
-        self.client = AIClient()
+        super().__init__("CodeWriter", "code_writer")
 
-    def _setup_logging(self):
-        logger = logging.getLogger(self.name)
-        logger.setLevel(logging.INFO)
-        
-        Path("data/logs").mkdir(parents=True, exist_ok=True)
-        
-        handler = logging.FileHandler(f"data/logs/{self.name.lower()}.log")
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        
-        return logger
-        
     async def generate_code_project(self, project_spec: dict, language: str = "python"):
         """Generate a complete code project based on specifications"""
         self.status = "working"
         self.logger.info(f"Generating {language} project: {project_spec.get('name', 'Unnamed')}")
         
         try:
-            prompt = f"""
-            Generate a complete {language} code project based on these specifications:
-            
-            Project Specifications: {json.dumps(project_spec)}
-            
-            Requirements:
-            1. Create a well-structured project with proper file organization
-            2. Include all necessary files (main code, config, requirements, etc.)
-            3. Write clean, documented, and production-ready code
-            4. Include error handling and validation
-            5. Add appropriate comments and docstrings
-            6. Follow best practices for the chosen language
-            
-            Format as JSON with: project_structure, files (array with filename, content, description), setup_instructions, usage_examples
-            """
+            prompt = CODE_PROJECT_INPUT.format(
+                language=language,
+                project_spec=orjson.dumps(project_spec).decode()
+            )
             
-            response = await asyncio.to_thread(
-                self.client.client.chat.completions.create,  # Fixed client reference
-                model="gpt-4o-mini",  # Using available model
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"}
+            # Stream the response so files are decoded as they are generated
+            files_stream = JsonArrayStream("files")
+
+            def on_delta(delta):
+                for file_entry in files_stream.feed(delta):
+                    self.logger.info(f"Received file: {file_entry.get('filename', 'unnamed')}")
+
+            content_text = await llm_cache.cached_chat(
+                self.client.client,
+                model=MODEL,
+                messages=[
+                    {"role": "system", "content": CODE_PROJECT_SYSTEM},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"},
+                max_tokens=4000,
+                temperature=0.2,
+                on_delta=on_delta
             )
             
-            content_text = response.choices[0].message.content
             if not content_text:
                 raise ValueError("No code project content received from AI")
-            code_project = json.loads(content_text)
+            code_project = orjson.loads(content_text)
             
             output_data = {
                 "agent": self.name,
                 "type": "code_project",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso(),
                 "project_spec": project_spec,
                 "language": language,
                 "project": code_project
@@ -80,10 +88,10 @@ class CodeWriterAgent:
             self.status = "idle"
 
             # 📧 Send email after task completion
-            send_task_email(
+            await notifier.enqueue(
                 self.name,
                 f"Generated {language} project: {project_spec.get('name', 'Unnamed')}",
-                json.dumps(code_project, indent=2)
+                content_text
             )
 
             return code_project
@@ -92,31 +100,3 @@ class CodeWriterAgent:
             self.logger.error(f"Error generating code project: {str(e)}")
             self.status = "error"
             raise
-    
-    async def _save_to_queue(self, data):
-        """Save output to the queue system"""
-        Path("data/queue").mkdir(parents=True, exist_ok=True)
-        filename = f"data/queue/code_writer_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
-    
-    async def run_continuously(self):
-        """Run the agent in continuous mode"""
-        self.logger.info("CodeWriter started in continuous mode")
-        
-        while True:
-            try:
-                self.status = "monitoring"
-                await asyncio.sleep(70)
-                
-            except Exception as e:
-                self.logger.error(f"Error in continuous mode: {str(e)}")
-                await asyncio.sleep(20)
-    
-    def get_status(self):
-        return {
-            "name": self.name,
-            "status": self.status,
-            "last_active": datetime.now().isoformat()
-        }
\ No newline at end of file
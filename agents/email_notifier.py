@@ -1,16 +1,35 @@
 import os
+from functools import lru_cache
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
 
+# Read once at import; the client is built lazily if the key is set later
+_FROM = os.getenv("SENDGRID_FROM_EMAIL")
+_TO = os.getenv("SENDGRID_TO_EMAIL")
+_SG = SendGridAPIClient(os.getenv("SENDGRID_API_KEY")) if os.getenv("SENDGRID_API_KEY") else None
+
+
+def _client():
+    global _SG
+    if _SG is None:
+        _SG = SendGridAPIClient(os.getenv("SENDGRID_API_KEY"))
+    return _SG
+
+
+@lru_cache(maxsize=None)
+def _subject(agent_name: str) -> str:
+    return f"[Lincoln Agency] {agent_name} completed a task"
+
+
 def send_task_email(agent_name: str, task_description: str, result: str):
     """
     Sends an email after an agent completes a task.
     """
     try:
         message = Mail(
-            from_email=os.getenv("SENDGRID_FROM_EMAIL"),
-            to_emails=os.getenv("SENDGRID_TO_EMAIL"),
-            subject=f"[Lincoln Agency] {agent_name} completed a task",
+            from_email=_FROM or os.getenv("SENDGRID_FROM_EMAIL"),
+            to_emails=_TO or os.getenv("SENDGRID_TO_EMAIL"),
+            subject=_subject(agent_name),
             plain_text_content=f"""
             Agent: {agent_name}
             Task: {task_description}
@@ -18,8 +37,7 @@ def send_task_email(agent_name: str, task_description: str, result: str):
             {result}
             """
         )
-        sg = SendGridAPIClient(os.getenv("SENDGRID_API_KEY"))
-        sg.send(message)
+        _client().send(message)
         print(f"✅ Email sent for {agent_name}'s task.")
     except Exception as e:
         print(f"❌ Failed to send email: {e}")
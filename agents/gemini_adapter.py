@@ -29,3 +29,13 @@ class AIClient:
         else:  # Gemini
             response = self.client.GenerativeModel("gemini-pro").generate_content(prompt)
             return response.text
+
+
+_SHARED: AIClient | None = None
+
+def get_shared() -> AIClient:
+    """Return the process-wide AIClient so agents share one connection pool"""
+    global _SHARED
+    if _SHARED is None:
+        _SHARED = AIClient()
+    return _SHARED
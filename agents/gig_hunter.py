@@ -4,24 +4,153 @@ Gig Hunter Agent - Drafts proposals for freelance/contract opportunities
 Part of Lincoln Agency multi-agent system
 """
 import asyncio
-import json
-import logging
-from datetime import datetime
-from pathlib import Path
+import contextlib
+import hashlib
+import orjson
 import os
-import random
-from .gemini_adapter import AIClient
-from .email_notifier import send_task_email
+import time
+import weakref
+from pathlib import Path
+from . import _http as http
+from . import _llm_cache as llm_cache
+from . import _notifier as notifier
+from . import _openai_raw as openai_raw
+from . import _schemas as schemas
+from ._base import BaseAgent
+from ._clock import now_iso
+from ._rate_limit import TokenBucket
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # no flock on Windows, which runs a single worker
+
+# Concurrency and pacing for page analyses and proposals, kept under the
+# provider's rate limits
+MAX_PARALLEL_URLS = 8
+MAX_PARALLEL_PROPOSALS = 5
+REQUESTS_PER_MINUTE = int(os.getenv("LLM_RPM", "500"))
+TOKENS_PER_MINUTE = int(os.getenv("LLM_TPM", "200000"))
+CHARS_PER_TOKEN = 4
+
+# event loop -> (request bucket, token bucket); the buckets' locks belong to
+# one loop, so each loop gets its own pair
+_buckets = weakref.WeakKeyDictionary()
+
+
+def _rate_limits():
+    loop = asyncio.get_running_loop()
+    buckets = _buckets.get(loop)
+    if buckets is None:
+        buckets = (TokenBucket(REQUESTS_PER_MINUTE), TokenBucket(TOKENS_PER_MINUTE))
+        _buckets[loop] = buckets
+    return buckets
+
+# Per-URL trend analyses, keyed on the page content they were made from,
+# plus each platform's complete result, keyed on its prompt and URLs, which
+# lets hunts within TREND_REFRESH_INTERVAL skip fetching and analysis
+TREND_CACHE_FILE = Path("data/cache/trends.json")
+TREND_CACHE_TTL = 6 * 3600  # seconds
+TREND_REFRESH_INTERVAL = 3600  # seconds
+
+# Hashes of opportunity descriptions already proposed for, so repeated or
+# cached hunt results do not pay for the same proposal twice
+SEEN_PROPOSALS_FILE = Path("data/cache/seen_proposals.json")
+SEEN_PROPOSALS_TTL = 7 * 24 * 3600  # seconds
+
+TREND_PAGE_CHARS = 1500  # page text sent per URL in a batched trend prompt
+
+# Trend instructions are fixed system messages with the pages sent as a JSON
+# list of {url, text} in the user message, so every call shares a
+# byte-identical prefix for provider prompt caching and one call covers a
+# whole platform
+FIVERR_TREND_SYSTEM = """
+Analyze each Fiverr search page provided by the user (a JSON list of url and text) and identify 3-5 high-demand service opportunities
+per page that Lincoln Agency could offer. Provide realistic service descriptions.
+
+Format as JSON with: results (list of url and opportunities, where opportunities is a list of title, description, estimated_value, difficulty_level, market_demand)
+"""
+
+# Static instructions lead every request so the provider can cache the
+# shared prefix; the job details follow in the user message.
+PROPOSAL_SYSTEM = """
+As an expert proposal writer for Lincoln Agency, create a compelling freelance proposal for the job described by the user.
+
+Create a professional, personalized proposal that:
+1. Addresses the client's specific needs
+2. Highlights relevant Lincoln Agency expertise
+3. Provides clear project approach
+4. Includes realistic timeline and deliverables
+5. Shows understanding of the industry/niche
+
+Format the response as JSON with fields: title, introduction, approach, timeline, pricing_notes, closing
+"""
+
+PROPOSAL_INPUT = """
+Job Description: {job_description}
+Client Info: {client_info}
+"""
+
+GUMROAD_TREND_SYSTEM = """
+Analyze each Gumroad discover page provided by the user (a JSON list of url and text) and identify 3-5 digital product opportunities
+per page that Lincoln Agency could create. Provide detailed product concepts.
+
+Format as JSON with: results (list of url and opportunities, where opportunities is a list of title, description, target_audience, estimated_price, development_effort)
+"""
 
-class GigHunterAgent:
+def _load_expiring(path: Path) -> dict:
+    """Load a persisted {key: (expiry, ...)} cache, empty if missing or unreadable"""
+    try:
+        return orjson.loads(path.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+
+@contextlib.contextmanager
+def _file_lock(path: Path):
+    """Hold an exclusive flock on path's .lock file, shared by all workers"""
+    if fcntl is None:
+        yield
+        return
+    with open(path.with_name(path.name + ".lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def _merge_expiring(path: Path, cache: dict) -> dict:
+    """
+    Merge cache into the persisted copy, drop expired entries and write it.
+
+    Every web worker writes these files, so the read-merge-write runs under
+    a file lock and the new copy replaces the old one atomically; a reader
+    never sees a truncated file and no worker's entries are lost.
+    """
+    with _file_lock(path):
+        merged = _load_expiring(path)
+        merged.update(cache)
+        now = time.time()
+        merged = {k: v for k, v in merged.items() if v[0] > now}
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(orjson.dumps(merged))
+        os.replace(tmp, path)
+    return merged
+
+
+async def _save_expiring(path: Path, cache: dict) -> dict:
+    """Persist cache merged with other workers' entries and return the result"""
+    return await asyncio.to_thread(_merge_expiring, path, cache)
+
+
+class GigHunterAgent(BaseAgent):
     def __init__(self):
-        self.name = "GigHunter"
-        self.status = "idle"
-        self.logger = self._setup_logging()
-        self.client = AIClient()
+        super().__init__("GigHunter", "gig_hunter")
+        self._url_semaphore = asyncio.Semaphore(MAX_PARALLEL_URLS)
+        self._trend_cache = _load_expiring(TREND_CACHE_FILE)
+        self._seen_proposals = _load_expiring(SEEN_PROPOSALS_FILE)
 
-        self.last_hunt_time = datetime.now()
+        self.last_hunt_monotonic = time.monotonic()
         self.hunt_interval = 300  # Hunt every 5 minutes
+        self._hunt = None  # future of the latest hunt from start_hunt()
         self.gig_platforms = {
             "fiverr": {
                 "search_urls": [
@@ -42,69 +171,48 @@ class GigHunterAgent:
             }
         }
         
-    def _setup_logging(self):
-        logger = logging.getLogger(self.name)
-        logger.setLevel(logging.INFO)
-        
-        Path("data/logs").mkdir(parents=True, exist_ok=True)
-        
-        handler = logging.FileHandler(f"data/logs/{self.name.lower()}.log")
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        
-        return logger
-
     async def _fetch_page_text(self, url: str) -> str:
         """Fetch and extract clean text content from a URL"""
-        # Placeholder implementation - you'll need to implement actual web scraping
-        # or use a proper web scraping library with proper error handling
         try:
-            # For now, return empty string - implement proper web scraping
-            return ""
+            return await http.fetch_text(url)
         except Exception as e:
             self.logger.error(f"Error fetching {url}: {str(e)}")
             return ""
-        
+
     async def generate_proposal(self, job_description: str, client_info: dict | None = None):
         """Generate a tailored proposal based on job description and client info"""
         self.status = "working"
         self.logger.info(f"Generating proposal for job: {job_description[:100]}...")
         
         try:
-            prompt = f"""
-            As an expert proposal writer for Lincoln Agency, create a compelling freelance proposal for this job:
-            
-            Job Description: {job_description}
-            Client Info: {json.dumps(client_info or {}) if client_info else "Not provided"}
-            
-            Create a professional, personalized proposal that:
-            1. Addresses the client's specific needs
-            2. Highlights relevant Lincoln Agency expertise
-            3. Provides clear project approach
-            4. Includes realistic timeline and deliverables
-            5. Shows understanding of the industry/niche
-            
-            Format the response as JSON with fields: title, introduction, approach, timeline, pricing_notes, closing
-            """
+            prompt = PROPOSAL_INPUT.format(
+                job_description=job_description,
+                client_info=orjson.dumps(client_info).decode() if client_info else "Not provided"
+            )
             
-            response = await asyncio.to_thread(
-                self.client.client.chat.completions.create,  # Fixed client reference
+            request_bucket, token_bucket = _rate_limits()
+            await request_bucket.acquire()
+            await token_bucket.acquire((len(PROPOSAL_SYSTEM) + len(prompt)) // CHARS_PER_TOKEN)
+
+            content = await llm_cache.cached_chat(
+                self.client.client,
                 model="gpt-4o-mini",  # Using available model
-                messages=[{"role": "user", "content": prompt}],
+                messages=[
+                    {"role": "system", "content": PROPOSAL_SYSTEM},
+                    {"role": "user", "content": prompt}
+                ],
                 response_format={"type": "json_object"}
             )
-            
-            content = response.choices[0].message.content
+
             if not content:
                 raise ValueError("No content received from AI")
-            proposal = json.loads(content)
+            proposal = schemas.validate_proposal(orjson.loads(content))
             
             # Save to queue
             output_data = {
                 "agent": self.name,
                 "type": "proposal",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso(),
                 "job_description": job_description,
                 "proposal": proposal
             }
@@ -114,10 +222,10 @@ class GigHunterAgent:
             self.status = "idle"
 
             # 📧 Send email after task completion
-            send_task_email(
+            await notifier.enqueue(
                 self.name,
                 f"Generated proposal for job: {job_description[:50]}...",
-                json.dumps(proposal, indent=2)
+                content
             )
             return proposal
             
@@ -126,56 +234,97 @@ class GigHunterAgent:
             self.status = "error"
             raise
     
-    async def _save_to_queue(self, data):
-        """Save output to the queue system"""
-        Path("data/queue").mkdir(parents=True, exist_ok=True)
-        filename = f"data/queue/gig_hunter_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
-    
+    async def _save_trend_cache(self):
+        self._trend_cache = await _save_expiring(TREND_CACHE_FILE, self._trend_cache)
+
+    async def _fetch_limited(self, url: str) -> str:
+        async with self._url_semaphore:
+            return await self._fetch_page_text(url)
+
+    async def _analyze_urls(self, urls: list, trend_system: str, validate):
+        """Analyze all search pages of a platform in one AI call and flatten their opportunities"""
+        platform_key = "platform|" + hashlib.sha256("\n".join([trend_system, *urls]).encode()).hexdigest()
+        cached = self._trend_cache.get(platform_key)
+        if cached and cached[0] > time.time():
+            return cached[1]
+
+        pages = await asyncio.gather(*(self._fetch_limited(url) for url in urls))
+
+        # Unchanged pages reuse the last analysis until it expires
+        now = time.time()
+        results = {}
+        pending = []
+        complete = all(pages)
+        for url, page_text in zip(urls, pages):
+            if not page_text:
+                continue
+            page_text = page_text[:TREND_PAGE_CHARS]
+            cache_key = f"{url}|{hashlib.sha256(page_text.encode()).hexdigest()}"
+            cached = self._trend_cache.get(cache_key)
+            if cached and cached[0] > now:
+                results[url] = cached[1]
+            else:
+                pending.append((url, page_text, cache_key))
+
+        if pending:
+            try:
+                pages_json = orjson.dumps([{"url": url, "text": text} for url, text, _ in pending]).decode()
+                content = await llm_cache.cached_chat(
+                    self.client.client,
+                    model="gpt-4o-mini",  # Using available model
+                    messages=[
+                        {"role": "system", "content": trend_system},
+                        {"role": "user", "content": pages_json}
+                    ],
+                    response_format={"type": "json_object"},
+                    transport=openai_raw.chat
+                )
+                if not content:
+                    raise ValueError("No trend analysis received from AI")
+                by_url = {
+                    result["url"]: result["opportunities"]
+                    for result in validate(orjson.loads(content))["results"]
+                }
+
+                expiry = time.time() + TREND_CACHE_TTL
+                for url, _, cache_key in pending:
+                    results[url] = by_url.get(url, [])
+                    self._trend_cache[cache_key] = (expiry, results[url])
+            except Exception as e:
+                self.logger.error(f"Error analyzing {len(pending)} pages: {str(e)}")
+                complete = False
+
+        opportunities = []
+        for url in urls:
+            opportunities.extend(results.get(url, []))
+
+        # Only a result covering every page stands in for the platform
+        if complete:
+            self._trend_cache[platform_key] = (time.time() + TREND_REFRESH_INTERVAL, opportunities)
+        if complete or pending:
+            try:
+                await self._save_trend_cache()
+            except Exception as e:
+                self.logger.error(f"Error saving trend cache: {str(e)}")
+        return opportunities
+
     async def _analyze_fiverr_trends(self):
         """Analyze Fiverr for trending services and opportunities"""
         opportunities = []
         
         try:
-            for url in self.gig_platforms["fiverr"]["search_urls"]:
-                page_text = await asyncio.to_thread(self._fetch_page_text, url)
-                if not page_text:
-                    continue
-                
-                # Use AI to analyze fetched content
-                prompt = f"""
-                Analyze the following Fiverr search page text and identify 3-5 high-demand service opportunities 
-                that Lincoln Agency could offer. Provide realistic service descriptions.
-                
-                Page Content: {page_text[:3000]}  # limit size
-                
-                Format as JSON with: opportunities (list of title, description, estimated_value, difficulty_level, market_demand)
-                """
-                
-                response = await asyncio.to_thread(
-                    self.client.client.chat.completions.create,  # Fixed client reference
-                    model="gpt-4o-mini",  # Using available model
-                    messages=[{"role": "user", "content": prompt}],
-                    response_format={"type": "json_object"}
-                )
-                
-                content = response.choices[0].message.content
-                if content:
-                    trend_data = json.loads(content)
-                    if "opportunities" in trend_data:
-                        for opp in trend_data["opportunities"]:
-                            opportunities.append({
-                                "platform": "fiverr",
-                                "title": opp.get("title", "Service Opportunity"),
-                                "description": opp.get("description", ""),
-                                "client_info": {
-                                    "platform": "Fiverr",
-                                    "estimated_value": opp.get("estimated_value", "$50-500"),
-                                    "market_demand": opp.get("market_demand", "medium")
-                                }
-                            })
+            urls = self.gig_platforms["fiverr"]["search_urls"]
+            for opp in await self._analyze_urls(urls, FIVERR_TREND_SYSTEM, schemas.validate_fiverr_trends):
+                opportunities.append({
+                    "platform": "fiverr",
+                    "title": opp["title"],
+                    "description": opp["description"],
+                    "client_info": {
+                        "platform": "Fiverr",
+                        "estimated_value": opp["estimated_value"],
+                        "market_demand": opp["market_demand"]
+                    }
+                })
             
             self.logger.info(f"Analyzed Fiverr trends, found {len(opportunities)} opportunities")
             
@@ -189,43 +338,19 @@ class GigHunterAgent:
         opportunities = []
         
         try:
-            for url in self.gig_platforms["gumroad"]["search_urls"]:
-                page_text = await asyncio.to_thread(self._fetch_page_text, url)
-                if not page_text:
-                    continue
-                
-                prompt = f"""
-                Analyze the following Gumroad discover page text and identify 3-5 digital product opportunities 
-                that Lincoln Agency could create. Provide detailed product concepts.
-                
-                Page Content: {page_text[:3000]}  # limit size
-                
-                Format as JSON with: opportunities (list of title, description, target_audience, estimated_price, development_effort)
-                """
-                
-                response = await asyncio.to_thread(
-                    self.client.client.chat.completions.create,  # Fixed client reference
-                    model="gpt-4o-mini",  # Using available model
-                    messages=[{"role": "user", "content": prompt}],
-                    response_format={"type": "json_object"}
-                )
-                
-                content = response.choices[0].message.content
-                if content:
-                    product_data = json.loads(content)
-                    if "opportunities" in product_data:
-                        for opp in product_data["opportunities"]:
-                            opportunities.append({
-                                "platform": "gumroad",
-                                "title": opp.get("title", "Digital Product Opportunity"),
-                                "description": f"Create digital product: {opp.get('description', '')}",
-                                "client_info": {
-                                    "platform": "Gumroad",
-                                    "target_audience": opp.get("target_audience", "Business professionals"),
-                                    "estimated_price": opp.get("estimated_price", "$20-100"),
-                                    "product_type": "digital"
-                                }
-                            })
+            urls = self.gig_platforms["gumroad"]["search_urls"]
+            for opp in await self._analyze_urls(urls, GUMROAD_TREND_SYSTEM, schemas.validate_gumroad_trends):
+                opportunities.append({
+                    "platform": "gumroad",
+                    "title": opp["title"],
+                    "description": f"Create digital product: {opp['description']}",
+                    "client_info": {
+                        "platform": "Gumroad",
+                        "target_audience": opp["target_audience"],
+                        "estimated_price": opp["estimated_price"],
+                        "product_type": "digital"
+                    }
+                })
             
             self.logger.info(f"Analyzed Gumroad trends, found {len(opportunities)} opportunities")
             
@@ -250,20 +375,38 @@ class GigHunterAgent:
             gumroad_ops = await self._analyze_gumroad_trends()
             found_opportunities.extend(gumroad_ops)
             
-            # Generate proposals
+            # Generate proposals, once per distinct description
+            now = time.time()
+            new_opportunities = {}
             for opportunity in found_opportunities:
-                try:
-                    proposal = await self.generate_proposal(
-                        opportunity["description"],
-                        opportunity.get("client_info", {})
-                    )
-                    self.logger.info(f"Generated proposal for: {opportunity['title'][:50]}...")
-                    await asyncio.sleep(2)  # Rate limiting
-                except Exception as e:
-                    self.logger.error(f"Error generating proposal for opportunity: {str(e)}")
+                digest = hashlib.blake2b(opportunity["description"].encode(), digest_size=16).hexdigest()
+                seen = self._seen_proposals.get(digest)
+                if not (seen and seen[0] > now):
+                    new_opportunities.setdefault(digest, opportunity)
+            skipped = len(found_opportunities) - len(new_opportunities)
+            if skipped:
+                self.logger.info(f"Skipping {skipped} already-proposed opportunities")
+
+            semaphore = asyncio.Semaphore(MAX_PARALLEL_PROPOSALS)
+
+            async def propose(digest, opportunity):
+                async with semaphore:
+                    try:
+                        await self.generate_proposal(
+                            opportunity["description"],
+                            opportunity.get("client_info", {})
+                        )
+                        self._seen_proposals[digest] = (time.time() + SEEN_PROPOSALS_TTL,)
+                        self.logger.info(f"Generated proposal for: {opportunity['title'][:50]}...")
+                    except Exception as e:
+                        self.logger.error(f"Error generating proposal for opportunity: {str(e)}")
+
+            await asyncio.gather(*(propose(d, o) for d, o in new_opportunities.items()))
+            if new_opportunities:
+                self._seen_proposals = await _save_expiring(SEEN_PROPOSALS_FILE, self._seen_proposals)
             
             self.logger.info(f"Gig hunt completed. Found {len(found_opportunities)} opportunities")
-            self.last_hunt_time = datetime.now()
+            self.last_hunt_monotonic = time.monotonic()
             
         except Exception as e:
             self.logger.error(f"Error during gig hunt: {str(e)}")
@@ -272,26 +415,44 @@ class GigHunterAgent:
         return found_opportunities
     
     async def run_continuously(self):
-        """Run the agent in continuous mode, actively hunting for gigs"""
+        """Run the agent in continuous mode, hunting every hunt_interval and serving jobs in between"""
         self.logger.info("GigHunter agent started in continuous mode - actively hunting for opportunities")
-        
-        while True:
-            try:
-                self.status = "monitoring"
-                time_since_last_hunt = (datetime.now() - self.last_hunt_time).total_seconds()
-                
-                if time_since_last_hunt >= self.hunt_interval:
-                    await self.hunt_for_gigs()
-                
-                await asyncio.sleep(60)  # check every minute
-                
-            except Exception as e:
-                self.logger.error(f"Error in continuous mode: {str(e)}")
-                await asyncio.sleep(30)
-    
-    def get_status(self):
-        return {
-            "name": self.name,
-            "status": self.status,
-            "last_active": datetime.now().isoformat()
-        }
\ No newline at end of file
+        self.status = "monitoring"
+        self._loop_started = True
+
+        try:
+            while True:
+                time_since_last_hunt = time.monotonic() - self.last_hunt_monotonic
+                try:
+                    job = await asyncio.wait_for(self._jobs.get(), max(0, self.hunt_interval - time_since_last_hunt))
+                except asyncio.TimeoutError:
+                    self.last_hunt_monotonic = time.monotonic()
+                    if self.hunt_running():
+                        self.logger.info("Previous gig hunt still running - skipping this interval")
+                        continue
+                    self.start_hunt().add_done_callback(self._log_hunt_failure)
+                    continue
+                self._start_job(job)
+        finally:
+            self._loop_started = False
+
+    def hunt_running(self) -> bool:
+        """Whether a hunt started by start_hunt() has not finished yet"""
+        return self._hunt is not None and not self._hunt.done()
+
+    def start_hunt(self) -> asyncio.Future:
+        """
+        Start a gig hunt and return a future for its opportunities.
+
+        Scheduled and manual hunts both go through here, so callers check
+        hunt_running() first; two hunts would race on the seen-proposal and
+        trend caches.
+        """
+        if self.hunt_running():
+            raise RuntimeError("A gig hunt is already running")
+        self._hunt = self.submit("hunt_for_gigs")
+        return self._hunt
+
+    def _log_hunt_failure(self, future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None:
+            self.logger.error(f"Scheduled gig hunt failed: {str(future.exception())}")
@@ -4,40 +4,129 @@ Product Factory Agent - Generates ebooks and templates automatically
 Part of Lincoln Agency multi-agent system
 """
 import asyncio
-import json
-import logging
-from datetime import datetime
+import orjson
 from pathlib import Path
-import os
-from .gemini_adapter import AIClient
-from .email_notifier import send_task_email
+from . import _llm_cache as llm_cache
+from . import _notifier as notifier
+from . import _schemas as schemas
+from ._base import BaseAgent
+from ._clock import now_iso
+from ._hot import queue_path
 
 
 
 # the newest OpenAI model is "gpt-5" which was released August 7, 2025.
 # do not change this unless explicitly requested by the user
 
-class ProductFactoryAgent:
+MAX_PARALLEL_CHAPTERS = 5
+CHAPTER_FLUSH_CHARS = 16 * 1024  # streamed text buffered before each file write
+
+# Outlines and templates for the same inputs change slowly, so cached
+# responses are reused for a day
+PROMPT_CACHE_TTL = 24 * 3600  # seconds
+
+# Static instructions lead every request so the provider can cache the
+# shared prefix; the topic, outline or template details follow in the user
+# message.
+OUTLINE_SYSTEM = """
+Create a detailed outline for an ebook about the topic and audience given by the user,
+with the requested number of chapters.
+
+Each chapter should include:
+1. Chapter titles
+2. Key points for each chapter
+3. Learning objectives
+4. Practical exercises or examples
+
+Format as JSON with: title, description, target_audience, chapters array
+"""
+
+OUTLINE_INPUT = """
+Topic: {topic}
+Target Audience: {target_audience}
+Chapter Count: {chapter_count}
+"""
+
+CHAPTER_SYSTEM = """
+Write the full content for the ebook chapter described by the user.
+
+Write engaging, informative content (800-1200 words) that includes:
+- Clear explanations
+- Practical examples
+- Actionable advice
+- Professional insights
+
+Format as plain text content.
+"""
+
+CHAPTER_INPUT = """
+Chapter {number}: {title}
+Topic: {topic}
+Target Audience: {target_audience}
+Chapter Outline: {outline}
+"""
+
+TEMPLATE_SYSTEM = """
+Create a professional business template of the type and for the industry given by the user.
+
+The template should:
+1. Include all necessary legal and business sections
+2. Use professional language and formatting
+3. Include placeholder fields marked with [FIELD_NAME]
+4. Be industry-specific and comprehensive
+5. Follow best practices for that template type
+
+Format the response as JSON with: title, description, sections array, placeholders array
+"""
+
+TEMPLATE_INPUT = """
+Template Type: {template_type}
+Industry: {industry}
+"""
+
+def _append_text(path: Path, text: str):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+class _ChapterWriter:
+    """Buffer streamed chapter text and append it to a file off the event loop"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._buffer = []
+        self._size = 0
+        self._flushing = None  # latest write; each one waits for the previous
+
+    def write(self, text: str):
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= CHAPTER_FLUSH_CHARS:
+            self._flush()
+
+    def _flush(self):
+        text = "".join(self._buffer)
+        self._buffer, self._size = [], 0
+        previous = self._flushing
+
+        async def append():
+            if previous is not None:
+                await previous
+            await asyncio.to_thread(_append_text, self.path, text)
+
+        self._flushing = asyncio.ensure_future(append())
+
+    async def close(self):
+        """Write whatever is still buffered and wait for all writes to finish"""
+        if self._buffer or self._flushing is None:
+            self._flush()
+        await self._flushing
+
+
+class ProductFactoryAgent(BaseAgent):
     def __init__(self):
-        self.name = "ProductFactory"
-        self.status = "idle"
-        self.logger = self._setup_logging()
-        self.client = AIClient()
+        super().__init__("ProductFactory", "product_factory")
 
-        
-    def _setup_logging(self):
-        logger = logging.getLogger(self.name)
-        logger.setLevel(logging.INFO)
-        
-        Path("data/logs").mkdir(parents=True, exist_ok=True)
-        
-        handler = logging.FileHandler(f"data/logs/{self.name.lower()}.log")
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        
-        return logger
-        
     async def generate_ebook(self, topic: str, target_audience: str, chapter_count: int = 7):
         """Generate a comprehensive ebook on the given topic"""
         self.status = "working"
@@ -45,81 +134,101 @@ class ProductFactoryAgent:
         
         try:
             # Generate ebook outline first
-            outline_prompt = f"""
-            Create a detailed outline for an ebook titled about "{topic}" for {target_audience}.
-            
-            Include {chapter_count} chapters with:
-            1. Chapter titles
-            2. Key points for each chapter
-            3. Learning objectives
-            4. Practical exercises or examples
-            
-            Format as JSON with: title, description, target_audience, chapters array
-            """
+            outline_prompt = OUTLINE_INPUT.format(
+                topic=topic,
+                target_audience=target_audience,
+                chapter_count=chapter_count
+            )
             
-            outline_response = await asyncio.to_thread(
-                self.openai_client.chat.completions.create,
+            content = await llm_cache.cached_chat(
+                self.client.client,
                 model="gpt-5",
-                messages=[{"role": "user", "content": outline_prompt}],
-                response_format={"type": "json_object"}
+                messages=[
+                    {"role": "system", "content": OUTLINE_SYSTEM},
+                    {"role": "user", "content": outline_prompt}
+                ],
+                response_format={"type": "json_object"},
+                ttl=PROMPT_CACHE_TTL
             )
             
-            content = outline_response.choices[0].message.content
             if not content:
                 raise ValueError("No outline content received from OpenAI")
-            outline = json.loads(content)
+            outline = schemas.validate_ebook_outline(orjson.loads(content))
             
-            # Generate full content for each chapter
-            full_ebook = outline.copy()
-            full_ebook["chapters_content"] = []
+            # Chapters only depend on the outline, so write them concurrently,
+            # each streamed into its own file under the book's directory
+            book_dir = Path(queue_path("ebook")).with_suffix("")
+            await asyncio.to_thread(book_dir.mkdir, parents=True, exist_ok=True)
+            semaphore = asyncio.Semaphore(MAX_PARALLEL_CHAPTERS)
+            results = await asyncio.gather(
+                *(self._gen_chapter(i, chapter, topic, target_audience, semaphore, book_dir)
+                  for i, chapter in enumerate(outline["chapters"])),
+                return_exceptions=True
+            )
+
+            # A failed chapter does not discard the others, but the ebook is
+            # marked incomplete and lists the chapters that are missing
+            chapters_content = []
+            failed_chapters = []
+            for i, result in enumerate(results):
+                if isinstance(result, Exception):
+                    self.logger.error(f"Error writing chapter {i+1}: {str(result)}")
+                    failed_chapters.append(i + 1)
+                else:
+                    chapters_content.append(result)
+            ebook_status = "incomplete" if failed_chapters else "complete"
             
-            for i, chapter in enumerate(outline["chapters"]):
-                chapter_prompt = f"""
-                Write the full content for Chapter {i+1}: {chapter.get('title', f'Chapter {i+1}')}
-                
-                Topic: {topic}
-                Target Audience: {target_audience}
-                Chapter Outline: {json.dumps(chapter)}
-                
-                Write engaging, informative content (800-1200 words) that includes:
-                - Clear explanations
-                - Practical examples
-                - Actionable advice
-                - Professional insights
-                
-                Format as plain text content.
-                """
-                
-                chapter_response = await asyncio.to_thread(
-                    self.openai_client.chat.completions.create,
-                    model="gpt-5",
-                    messages=[{"role": "user", "content": chapter_prompt}]
-                )
-                
-                full_ebook["chapters_content"].append({
-                    "chapter_number": i + 1,
-                    "title": chapter.get('title', f'Chapter {i+1}'),
-                    "content": chapter_response.choices[0].message.content
-                })
+            # The dashboard shows the outline chapters as a table of contents
+            full_ebook = {
+                "status": ebook_status,
+                "failed_chapters": failed_chapters,
+                "title": outline["title"],
+                "description": outline["description"],
+                "target_audience": outline.get("target_audience", target_audience),
+                "chapters": outline["chapters"],
+                "chapters_content": chapters_content
+            }
+            
+            # The queue record and email carry a manifest pointing at the
+            # chapter files, without the outline or chapter text. It is
+            # encoded once; the queue record embeds the bytes and the email
+            # sends them
+            manifest = {
+                "status": ebook_status,
+                "failed_chapters": failed_chapters,
+                "title": full_ebook["title"],
+                "description": full_ebook["description"],
+                "target_audience": full_ebook["target_audience"],
+                "directory": str(book_dir),
+                "chapters_content": [
+                    {k: v for k, v in chapter.items() if k != "content"}
+                    for chapter in chapters_content
+                ]
+            }
+            ebook_json = orjson.dumps(manifest)
             
             output_data = {
                 "agent": self.name,
                 "type": "ebook",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso(),
                 "topic": topic,
                 "target_audience": target_audience,
-                "ebook": full_ebook
+                "ebook": orjson.Fragment(ebook_json)
             }
             
             await self._save_to_queue(output_data)
-            self.logger.info("Ebook generated successfully")
+            if failed_chapters:
+                self.logger.warning(f"Ebook generated without chapters {failed_chapters}")
+            else:
+                self.logger.info("Ebook generated successfully")
             self.status = "idle"
 
             # 📧 Send email after task completion
-            send_task_email(
+            await notifier.enqueue(
                 self.name,
-                f"Generated ebook project: {topic}",
-                json.dumps(full_ebook, indent=2)
+                f"Generated ebook project: {topic}" if not failed_chapters
+                else f"Incomplete ebook project: {topic} (chapters {failed_chapters} failed)",
+                ebook_json.decode()
             )
 
             return full_ebook
@@ -129,41 +238,68 @@ class ProductFactoryAgent:
             self.status = "error"
             raise
     
+    async def _gen_chapter(self, i: int, chapter: dict, topic: str, target_audience: str,
+                           semaphore: asyncio.Semaphore, book_dir: Path):
+        """Write the full text of one outlined chapter, streaming it to book_dir as it arrives"""
+        title = chapter.get('title', f'Chapter {i+1}')
+        chapter_prompt = CHAPTER_INPUT.format(
+            number=i + 1,
+            title=title,
+            topic=topic,
+            target_audience=target_audience,
+            outline=orjson.dumps(chapter).decode()
+        )
+        
+        path = book_dir / f"chapter_{i+1}.txt"
+        writer = _ChapterWriter(path)
+        async with semaphore:
+            try:
+                content = await llm_cache.cached_chat(
+                    self.client.client,
+                    model="gpt-5",
+                    messages=[
+                        {"role": "system", "content": CHAPTER_SYSTEM},
+                        {"role": "user", "content": chapter_prompt}
+                    ],
+                    on_delta=writer.write
+                )
+            finally:
+                await writer.close()
+        
+        return {
+            "chapter_number": i + 1,
+            "title": title,
+            "file": str(path),
+            "content": content
+        }
+    
     async def generate_template(self, template_type: str, industry: str):
         """Generate business templates (contracts, proposals, etc.)"""
         self.status = "working"
         self.logger.info(f"Generating {template_type} template for {industry}")
         
         try:
-            prompt = f"""
-            Create a professional {template_type} template specifically for the {industry} industry.
-            
-            The template should:
-            1. Include all necessary legal and business sections
-            2. Use professional language and formatting
-            3. Include placeholder fields marked with [FIELD_NAME]
-            4. Be industry-specific and comprehensive
-            5. Follow best practices for {template_type}
-            
-            Format the response as JSON with: title, description, sections array, placeholders array
-            """
+            prompt = TEMPLATE_INPUT.format(template_type=template_type, industry=industry)
             
-            response = await asyncio.to_thread(
-                self.client.client.chat.completions.create,
+            content = await llm_cache.cached_chat(
+                self.client.client,
                 model="gpt-5",
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"}
+                messages=[
+                    {"role": "system", "content": TEMPLATE_SYSTEM},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"},
+                ttl=PROMPT_CACHE_TTL
             )
             
-            content = response.choices[0].message.content
             if not content:
                 raise ValueError("No template content received from OpenAI")
-            template = json.loads(content)
+            template = schemas.validate_template(orjson.loads(content))
             
             output_data = {
                 "agent": self.name,
                 "type": "template",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso(),
                 "template_type": template_type,
                 "industry": industry,
                 "template": template
@@ -174,10 +310,10 @@ class ProductFactoryAgent:
             self.status = "idle"
 
             # 📧 Send email after task completion
-            send_task_email(
+            await notifier.enqueue(
                 self.name,
                 f"Generated {template_type} template for {industry}",
-                json.dumps(template, indent=2)
+                content
             )
 
             return template
@@ -186,31 +322,3 @@ class ProductFactoryAgent:
             self.logger.error(f"Error generating template: {str(e)}")
             self.status = "error"
             raise
-    
-    async def _save_to_queue(self, data):
-        """Save output to the queue system"""
-        Path("data/queue").mkdir(parents=True, exist_ok=True)
-        filename = f"data/queue/product_factory_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
-    
-    async def run_continuously(self):
-        """Run the agent in continuous mode"""
-        self.logger.info("ProductFactory agent started in continuous mode")
-        
-        while True:
-            try:
-                self.status = "monitoring"
-                await asyncio.sleep(60)  # Check every minute
-                
-            except Exception as e:
-                self.logger.error(f"Error in continuous mode: {str(e)}")
-                await asyncio.sleep(15)
-    
-    def get_status(self):
-        return {
-            "name": self.name,
-            "status": self.status,
-            "last_active": datetime.now().isoformat()
-        }
\ No newline at end of file
@@ -6,27 +6,43 @@ Provides web dashboard and API endpoints for the orchestrator
 from fastapi import FastAPI, Request, BackgroundTasks
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 import asyncio
+import importlib.util
 import logging
 import os
 from pathlib import Path
 import sys
+import time
+import orjson
 import uvicorn
 from dotenv import load_dotenv
 
+# Load environment variables before the agents are imported; they read
+# their settings (LLM_MODEL, CONTENT_BACKEND, ...) at import time
+load_dotenv()
+
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 # Import the orchestrator
 from orchestrator import orchestrator
+from agents import _executor as executor
+from agents import _notifier as notifier
+from agents import _queue_writer as queue_writer
+from agents import _llm_dispatcher as llm_dispatcher
+from agents import _openai_raw as openai_raw
+from agents import _http as http
 
-# Load environment variables
-load_dotenv()
-
-# Create FastAPI app
+# Create FastAPI app; with ENV=prod the OpenAPI schema and docs pages are
+# not served, so the schema is never built
+docs_enabled = os.getenv("ENV") != "prod"
 app = FastAPI(
     title="Lincoln Agency Multi-Agent System",
     description="Business AI Partner with specialized agents",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    openapi_url="/openapi.json" if docs_enabled else None,
+    docs_url="/docs" if docs_enabled else None,
+    redoc_url="/redoc" if docs_enabled else None
 )
 
 # Setup templates
@@ -39,21 +55,121 @@ logger = logging.getLogger(__name__)
 # Global variable to track orchestrator task
 orchestrator_task = None
 
+# Uvicorn worker processes (LINCOLN_WEB_WORKERS, default: 1). Every worker
+# serves the API, but only the one holding LEADER_LOCK_FILE runs the agent
+# loops (gig hunting, monitoring); the others run submitted tasks directly.
+WEB_WORKERS = int(os.getenv("LINCOLN_WEB_WORKERS", "1"))
+LEADER_LOCK_FILE = Path("data/orchestrator.lock")
+_leader_lock = None
+
+# Static agent metadata for /api/agents; only the live status is added per
+# response, and the encoded body is reused for AGENTS_CACHE_TTL seconds
+AGENTS_INFO = {
+    "gig_hunter": {
+        "name": "Gig Hunter",
+        "description": "Drafts compelling proposals for freelance and contract opportunities",
+        "capabilities": ["generate_proposal"]
+    },
+    "product_factory": {
+        "name": "Product Factory",
+        "description": "Generates ebooks and professional templates automatically",
+        "capabilities": ["generate_ebook", "generate_template"]
+    },
+    "content_agent": {
+        "name": "Content Agent",
+        "description": "Creates engaging short-form scripts and social media content",
+        "capabilities": ["create_social_content", "create_social_content_multi", "create_video_script"]
+    },
+    "outreach_agent": {
+        "name": "Outreach Agent",
+        "description": "Personalizes cold emails using recipient data and insights",
+        "capabilities": ["personalize_email"]
+    },
+    "fulfillment_agent": {
+        "name": "Fulfillment Agent",
+        "description": "Assembles comprehensive deliverables from multiple agent outputs",
+        "capabilities": ["assemble_deliverable"]
+    },
+    "code_writer": {
+        "name": "Code Writer",
+        "description": "Generates working code projects from specifications",
+        "capabilities": ["generate_code_project"]
+    },
+    "code_reviewer": {
+        "name": "Code Reviewer",
+        "description": "Reviews and improves generated code quality and security",
+        "capabilities": ["review_code"]
+    }
+}
+AGENTS_CACHE_TTL = 5.0  # seconds
+_agents_body = None  # (expires at, encoded body)
+
+# Fixed error bodies, encoded once
+ERROR_TASK_TYPE_REQUIRED = orjson.dumps({"error": "task_type is required"})
+ERROR_GIG_HUNTER_UNAVAILABLE = orjson.dumps({"error": "Gig Hunter agent not available"})
+ERROR_HUNT_RUNNING = orjson.dumps({"error": "A gig hunt is already running"})
+ERROR_NOT_READY = orjson.dumps({"error": "Agents are not ready yet", "orchestrator_status": "initializing"})
+ERROR_SYSTEM_STATUS = orjson.dumps({
+    "error": "Failed to get system status",
+    "orchestrator_status": "error",
+    "agents": {}
+})
+
+# Dashboard page template for each agent
+AGENT_TEMPLATES = {
+    "gig_hunter": "gig_hunter.html",
+    "product_factory": "product_factory.html",
+    "content_agent": "content_agent.html",
+    "outreach_agent": "outreach_agent.html",
+    "fulfillment_agent": "fulfillment_agent.html",
+    "code_writer": "code_writer.html",
+    "code_reviewer": "code_reviewer.html"
+}
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize the orchestrator when the app starts"""
     global orchestrator_task
     
     logger.info("Starting Lincoln Agency Multi-Agent System...")
+    executor.install()
+    
+    # Agents are initialized in the background so the port opens right away;
+    # /ready reports when they can take work
+    orchestrator_task = asyncio.create_task(_boot_orchestrator())
+
+def _acquire_leader_lock() -> bool:
+    """Whether this worker should run the agent loops (one worker per host)"""
+    global _leader_lock
+    try:
+        import fcntl
+    except ImportError:
+        # No flock on Windows; run a single worker there
+        return True
+    
+    lock_file = open(LEADER_LOCK_FILE, "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
     
+    # Held for the life of the process; the OS releases it if the worker dies
+    _leader_lock = lock_file
+    return True
+
+async def _boot_orchestrator():
+    """Initialize the agents, then run the orchestrator"""
     try:
-        # Initialize agents
         await orchestrator.initialize_agents()
         logger.info("Agents initialized successfully")
         
-        # Start orchestrator in background
-        orchestrator_task = asyncio.create_task(orchestrator.start_all_agents())
+        if not _acquire_leader_lock():
+            logger.info("Agent loops run in another worker - serving API tasks only")
+            return
+        
         logger.info("Orchestrator started in background")
+        await orchestrator.start_all_agents()
         
     except Exception as e:
         logger.error(f"Error during startup: {str(e)}")
@@ -71,6 +187,13 @@ async def shutdown_event():
             await orchestrator_task
         except asyncio.CancelledError:
             logger.info("Orchestrator task cancelled successfully")
+    
+    # Let queued emails and queue files finish before the loop closes
+    await notifier.drain(timeout=10)
+    await queue_writer.flush()
+    await llm_dispatcher.close()
+    await openai_raw.close()
+    await http.close()
 
 @app.get("/", response_class=HTMLResponse)
 async def dashboard(request: Request):
@@ -80,19 +203,9 @@ async def dashboard(request: Request):
 @app.get("/agent/{agent_name}", response_class=HTMLResponse)
 async def agent_page(request: Request, agent_name: str):
     """Individual agent pages"""
-    agent_templates = {
-        "gig_hunter": "gig_hunter.html",
-        "product_factory": "product_factory.html", 
-        "content_agent": "content_agent.html",
-        "outreach_agent": "outreach_agent.html",
-        "fulfillment_agent": "fulfillment_agent.html",
-        "code_writer": "code_writer.html",
-        "code_reviewer": "code_reviewer.html"
-    }
-    
-    template_name = agent_templates.get(agent_name)
+    template_name = AGENT_TEMPLATES.get(agent_name)
     if not template_name:
-        return JSONResponse(
+        return ORJSONResponse(
             content={"error": f"Agent '{agent_name}' not found"},
             status_code=404
         )
@@ -103,18 +216,10 @@ async def agent_page(request: Request, agent_name: str):
 async def get_system_status():
     """Get current system and agent status"""
     try:
-        status = orchestrator.get_system_status()
-        return JSONResponse(content=status)
+        return Response(content=orchestrator.get_system_status_json(), media_type="application/json")
     except Exception as e:
         logger.error(f"Error getting system status: {str(e)}")
-        return JSONResponse(
-            content={
-                "error": "Failed to get system status",
-                "orchestrator_status": "error",
-                "agents": {}
-            },
-            status_code=500
-        )
+        return Response(content=ERROR_SYSTEM_STATUS, media_type="application/json", status_code=500)
 
 @app.post("/api/execute-task")
 async def execute_task(task_data: dict):
@@ -122,17 +227,25 @@ async def execute_task(task_data: dict):
     try:
         task_type = task_data.get("task_type")
         if not task_type:
-            return JSONResponse(
-                content={"error": "task_type is required"},
-                status_code=400
-            )
+            return Response(content=ERROR_TASK_TYPE_REQUIRED, media_type="application/json", status_code=400)
+        
+        # Agents are initialized after the port opens; until then tasks get
+        # the same 503 as /ready
+        if orchestrator.status == "initializing":
+            return Response(content=ERROR_NOT_READY, media_type="application/json", status_code=503)
+        
+        # "background": true queues the task and returns without its result;
+        # agents still write their output to data/queue
+        if task_data.get("background"):
+            orchestrator.queue_task(task_type, task_data)
+            return ORJSONResponse(content={"success": True, "queued": True}, status_code=202)
         
         result = await orchestrator.execute_task(task_type, task_data)
-        return JSONResponse(content={"success": True, "result": result})
+        return ORJSONResponse(content={"success": True, "result": result})
         
     except Exception as e:
         logger.error(f"Error executing task: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             content={"error": f"Failed to execute task: {str(e)}"},
             status_code=500
         )
@@ -142,15 +255,16 @@ async def trigger_gig_hunt():
     """Manually trigger gig hunting for testing"""
     try:
         if "gig_hunter" not in orchestrator.agents:
-            return JSONResponse(
-                content={"error": "Gig Hunter agent not available"},
-                status_code=503
-            )
+            return Response(content=ERROR_GIG_HUNTER_UNAVAILABLE, media_type="application/json", status_code=503)
         
         agent = orchestrator.agents["gig_hunter"]
-        opportunities = await agent.hunt_for_gigs()
+        # Never alongside the scheduled hunt; both rewrite the gig caches
+        if agent.hunt_running():
+            return Response(content=ERROR_HUNT_RUNNING, media_type="application/json", status_code=409)
+        # Shielded so a dropped request does not mark the hunt as finished
+        opportunities = await asyncio.shield(agent.start_hunt())
         
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "success": True, 
             "message": f"Gig hunt completed successfully",
             "opportunities_found": len(opportunities),
@@ -159,7 +273,7 @@ async def trigger_gig_hunt():
         
     except Exception as e:
         logger.error(f"Error triggering gig hunt: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             content={"error": f"Failed to trigger gig hunt: {str(e)}"},
             status_code=500
         )
@@ -167,61 +281,36 @@ async def trigger_gig_hunt():
 @app.get("/api/agents")
 async def get_agents():
     """Get list of all agents and their capabilities"""
-    agents_info = {
-        "gig_hunter": {
-            "name": "Gig Hunter",
-            "description": "Drafts compelling proposals for freelance and contract opportunities",
-            "capabilities": ["generate_proposal"],
-            "status": orchestrator.agents.get("gig_hunter", {}).get("status", "unknown") if orchestrator.agents else "unknown"
-        },
-        "product_factory": {
-            "name": "Product Factory", 
-            "description": "Generates ebooks and professional templates automatically",
-            "capabilities": ["generate_ebook", "generate_template"],
-            "status": orchestrator.agents.get("product_factory", {}).get("status", "unknown") if orchestrator.agents else "unknown"
-        },
-        "content_agent": {
-            "name": "Content Agent",
-            "description": "Creates engaging short-form scripts and social media content",
-            "capabilities": ["create_social_content", "create_video_script"],
-            "status": orchestrator.agents.get("content_agent", {}).get("status", "unknown") if orchestrator.agents else "unknown"
-        },
-        "outreach_agent": {
-            "name": "Outreach Agent",
-            "description": "Personalizes cold emails using recipient data and insights",
-            "capabilities": ["personalize_email"],
-            "status": orchestrator.agents.get("outreach_agent", {}).get("status", "unknown") if orchestrator.agents else "unknown"
-        },
-        "fulfillment_agent": {
-            "name": "Fulfillment Agent",
-            "description": "Assembles comprehensive deliverables from multiple agent outputs",
-            "capabilities": ["assemble_deliverable"],
-            "status": orchestrator.agents.get("fulfillment_agent", {}).get("status", "unknown") if orchestrator.agents else "unknown"
-        },
-        "code_writer": {
-            "name": "Code Writer",
-            "description": "Generates working code projects from specifications",
-            "capabilities": ["generate_code_project"],
-            "status": orchestrator.agents.get("code_writer", {}).get("status", "unknown") if orchestrator.agents else "unknown"
-        },
-        "code_reviewer": {
-            "name": "Code Reviewer",
-            "description": "Reviews and improves generated code quality and security",
-            "capabilities": ["review_code"],
-            "status": orchestrator.agents.get("code_reviewer", {}).get("status", "unknown") if orchestrator.agents else "unknown"
+    global _agents_body
+    
+    now = time.monotonic()
+    if _agents_body is None or _agents_body[0] <= now:
+        agents_info = {
+            key: dict(info, status=getattr(orchestrator.agents.get(key), "status", "unknown"))
+            for key, info in AGENTS_INFO.items()
         }
-    }
+        _agents_body = (now + AGENTS_CACHE_TTL, orjson.dumps(agents_info))
     
-    return JSONResponse(content=agents_info)
+    return Response(content=_agents_body[1], media_type="application/json")
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return JSONResponse(content={
+    return Response(content=orjson.dumps({
         "status": "healthy",
         "service": "Lincoln Agency Multi-Agent System",
         "orchestrator_status": orchestrator.status
-    })
+    }), media_type="application/json")
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint - 503 until the agents have been initialized"""
+    ready = orchestrator.status in ("ready", "running")
+    return Response(
+        content=orjson.dumps({"ready": ready, "orchestrator_status": orchestrator.status}),
+        media_type="application/json",
+        status_code=200 if ready else 503
+    )
 
 def main():
     """Main function to run the FastAPI server"""
@@ -229,19 +318,26 @@ def main():
     if not os.getenv("OPENAI_API_KEY"):
         logger.warning("OPENAI_API_KEY not set - agents may not function properly")
     
-    # Create necessary directories
-    Path("data/queue").mkdir(parents=True, exist_ok=True)
-    Path("data/logs").mkdir(parents=True, exist_ok=True)
+    # data/ directories are created once when the agents package is imported
     Path("templates").mkdir(parents=True, exist_ok=True)
     
+    # libuv event loop and C HTTP parser when installed (uvloop has no
+    # Windows build, so the asyncio loop is used there)
+    loop_impl = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http_impl = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    
     # Start the FastAPI server
-    logger.info("Starting FastAPI server on 0.0.0.0:5000")
+    logger.info(f"Starting FastAPI server on 0.0.0.0:5000 (workers={WEB_WORKERS}, loop={loop_impl}, http={http_impl})")
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=5000,
         reload=False,
-        log_level="info"
+        workers=WEB_WORKERS,
+        log_level="info",
+        loop=loop_impl,
+        http=http_impl,
+        interface="asgi3"
     )
 
 if __name__ == "__main__":
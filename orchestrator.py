@@ -5,12 +5,12 @@ Main coordination system for multi-agent business AI partner
 """
 import asyncio
 import logging
-import json
 from datetime import datetime
-from pathlib import Path
 import importlib.util
 import sys
 import os
+import time
+import orjson
 
 # Import all agent classes
 from agents.gig_hunter import GigHunterAgent
@@ -20,29 +20,45 @@ from agents.outreach_agent import OutreachAgent
 from agents.fulfillment_agent import FulfillmentAgent
 from agents.code_writer import CodeWriterAgent
 from agents.code_reviewer import CodeReviewerAgent
+from agents import _executor as executor
+from agents import _llm_cache as llm_cache
+from agents import _logging as agent_logging
+from agents import _queue_writer as queue_writer
+from agents._base import BaseAgent
+from agents._clock import now_iso
+
+STATUS_SNAPSHOT_TTL = 1.0  # seconds
+STATUS_CACHE_TTL = 2.0  # seconds
+TASK_WORKERS = 4  # workers draining background tasks from tasks_queue
+
+# task type -> (agent name, ((task_data key, default), ...)); the task type
+# is also the agent method that runs it, and parameters are passed in order.
+# Defaults are shared between calls, so agents must not mutate them.
+TASK_ROUTES = {
+    "generate_proposal": ("gig_hunter", (("job_description", ""), ("client_info", None))),
+    "generate_ebook": ("product_factory", (("topic", ""), ("target_audience", ""), ("chapter_count", 7))),
+    "generate_template": ("product_factory", (("template_type", ""), ("industry", ""))),
+    "create_social_content": ("content_agent", (("platform", ""), ("topic", ""), ("brand_voice", "professional"))),
+    "create_social_content_multi": ("content_agent", (("platforms", []), ("topic", ""), ("brand_voice", "professional"))),
+    "create_video_script": ("content_agent", (("video_type", ""), ("duration", 2), ("topic", ""))),
+    "personalize_email": ("outreach_agent", (("recipient_info", {}), ("email_template", ""), ("campaign_goal", ""))),
+    "generate_code_project": ("code_writer", (("project_spec", {}), ("language", "python"))),
+    "review_code": ("code_reviewer", (("code_content", ""), ("language", "python"), ("review_criteria", None))),
+    "assemble_deliverable": ("fulfillment_agent", (("project_requirements", {}), ("agent_outputs", [])))
+}
 
 class AgentOrchestrator:
     def __init__(self):
         self.name = "Orchestrator"
         self.agents = {}
         self.status = "initializing"
-        self.logger = self._setup_logging()
+        self.logger = agent_logging.get(self.name)
         self.tasks_queue = asyncio.Queue()
+        self._task_workers = set()
         self.results_storage = []
-        
-    def _setup_logging(self):
-        logger = logging.getLogger(self.name)
-        logger.setLevel(logging.INFO)
-        
-        Path("data/logs").mkdir(parents=True, exist_ok=True)
-        
-        handler = logging.FileHandler("data/logs/orchestrator.log")
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        
-        return logger
-    
+        self._last_statuses = None  # (monotonic time, {name: status})
+        self._status_cache = None  # (monotonic time, encoded system status)
+            
     async def initialize_agents(self):
         """Initialize all agents"""
         self.logger.info("Initializing all agents...")
@@ -74,28 +90,24 @@ class AgentOrchestrator:
         self.logger.info("Starting all agents concurrently...")
         self.status = "running"
         
-        # Create tasks for all agents to run continuously
-        agent_tasks = []
-        for agent_name, agent in self.agents.items():
-            task = asyncio.create_task(
-                agent.run_continuously(),
-                name=f"{agent_name}_continuous"
-            )
-            agent_tasks.append(task)
-            self.logger.info(f"Started {agent_name} agent")
-        
-        # Also start the orchestrator's own monitoring task
-        orchestrator_task = asyncio.create_task(
-            self._monitor_system(),
-            name="orchestrator_monitor"
-        )
-        agent_tasks.append(orchestrator_task)
-        
         try:
-            # Run all agents concurrently
-            await asyncio.gather(*agent_tasks, return_exceptions=True)
-        except Exception as e:
-            self.logger.error(f"Error in concurrent agent execution: {str(e)}")
+            # Run all agents concurrently; if one fails, the rest are
+            # cancelled instead of running on without it
+            async with asyncio.TaskGroup() as tg:
+                for agent_name, agent in self.agents.items():
+                    # The base loop only forwards submitted jobs, which run
+                    # directly without it, so only agents with periodic
+                    # work of their own get a long-lived task
+                    if type(agent).run_continuously is BaseAgent.run_continuously:
+                        continue
+                    tg.create_task(agent.run_continuously(), name=f"{agent_name}_continuous")
+                    self.logger.info(f"Started {agent_name} agent")
+                
+                # Also start the orchestrator's own monitoring task
+                tg.create_task(self._monitor_system(), name="orchestrator_monitor")
+        except* Exception as eg:
+            for e in eg.exceptions:
+                self.logger.error(f"Error in concurrent agent execution: {str(e)}")
             self.status = "error"
             raise
     
@@ -106,20 +118,20 @@ class AgentOrchestrator:
         while True:
             try:
                 # Check agent statuses
-                agent_statuses = {}
-                for name, agent in self.agents.items():
-                    agent_statuses[name] = agent.get_status()
+                agent_statuses = self.collect_agent_statuses(max_age=0)
+                
+                healthy = sum(1 for s in agent_statuses.values() if s['status'] != 'error')
                 
                 # Log system status every 2 minutes
-                self.logger.info(f"System Status - Agents: {len([a for a in agent_statuses.values() if a['status'] != 'error'])}/{len(agent_statuses)} healthy")
+                self.logger.info(f"System Status - Agents: {healthy}/{len(agent_statuses)} healthy")
                 
                 # Save system status to queue
                 status_data = {
                     "agent": self.name,
                     "type": "system_status",
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": now_iso(),
                     "agent_statuses": agent_statuses,
-                    "system_health": "healthy" if all(s['status'] != 'error' for s in agent_statuses.values()) else "degraded"
+                    "system_health": "healthy" if healthy == len(agent_statuses) else "degraded"
                 }
                 
                 await self._save_status(status_data)
@@ -131,94 +143,85 @@ class AgentOrchestrator:
                 await asyncio.sleep(30)
     
     async def _save_status(self, status_data):
-        """Save system status to queue"""
-        Path("data/queue").mkdir(parents=True, exist_ok=True)
-        filename = f"data/queue/orchestrator_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        
-        with open(filename, 'w') as f:
-            json.dump(status_data, f, indent=2)
+        """Append system status to today's status log"""
+        status_log = agent_logging.LOG_DIR / f"orchestrator_status-{datetime.now().strftime('%Y%m%d')}.ndjson"
+        await queue_writer.enqueue(status_log, status_data)
+    
+    def collect_agent_statuses(self, max_age: float = STATUS_SNAPSHOT_TTL):
+        """Status of every agent, reusing a snapshot up to max_age seconds old"""
+        now = time.monotonic()
+        if self._last_statuses is None or now - self._last_statuses[0] >= max_age:
+            statuses = {name: agent.get_status() for name, agent in self.agents.items()}
+            self._last_statuses = (now, statuses)
+        return self._last_statuses[1]
     
     def get_system_status(self):
         """Get current system status"""
-        agent_statuses = {}
-        if self.agents:
-            for name, agent in self.agents.items():
-                agent_statuses[name] = agent.get_status()
-        
         return {
             "orchestrator_status": self.status,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "agents_count": len(self.agents),
-            "agents": agent_statuses
+            "agents": self.collect_agent_statuses(),
+            "llm_cache": llm_cache.stats()
         }
     
+    def get_system_status_json(self) -> bytes:
+        """get_system_status encoded as JSON, reused for STATUS_CACHE_TTL seconds"""
+        now = time.monotonic()
+        if self._status_cache is None or now - self._status_cache[0] >= STATUS_CACHE_TTL:
+            self._status_cache = (now, orjson.dumps(self.get_system_status()))
+        return self._status_cache[1]
+    
     async def execute_task(self, task_type: str, task_data: dict):
         """Execute a specific task using appropriate agent"""
         self.logger.info(f"Executing task: {task_type}")
         
         try:
-            if task_type == "generate_proposal" and "gig_hunter" in self.agents:
-                return await self.agents["gig_hunter"].generate_proposal(
-                    task_data.get("job_description", ""),
-                    task_data.get("client_info")
-                )
-            elif task_type == "generate_ebook" and "product_factory" in self.agents:
-                return await self.agents["product_factory"].generate_ebook(
-                    task_data.get("topic", ""),
-                    task_data.get("target_audience", ""),
-                    task_data.get("chapter_count", 7)
-                )
-            elif task_type == "generate_template" and "product_factory" in self.agents:
-                return await self.agents["product_factory"].generate_template(
-                    task_data.get("template_type", ""),
-                    task_data.get("industry", "")
-                )
-            elif task_type == "create_social_content" and "content_agent" in self.agents:
-                return await self.agents["content_agent"].create_social_content(
-                    task_data.get("platform", ""),
-                    task_data.get("topic", ""),
-                    task_data.get("brand_voice", "professional")
-                )
-            elif task_type == "create_video_script" and "content_agent" in self.agents:
-                return await self.agents["content_agent"].create_video_script(
-                    task_data.get("video_type", ""),
-                    task_data.get("duration", 2),
-                    task_data.get("topic", "")
-                )
-            elif task_type == "personalize_email" and "outreach_agent" in self.agents:
-                return await self.agents["outreach_agent"].personalize_email(
-                    task_data.get("recipient_info", {}),
-                    task_data.get("email_template", ""),
-                    task_data.get("campaign_goal", "")
-                )
-            elif task_type == "generate_code_project" and "code_writer" in self.agents:
-                return await self.agents["code_writer"].generate_code_project(
-                    task_data.get("project_spec", {}),
-                    task_data.get("language", "python")
-                )
-            elif task_type == "review_code" and "code_reviewer" in self.agents:
-                return await self.agents["code_reviewer"].review_code(
-                    task_data.get("code_content", ""),
-                    task_data.get("language", "python"),
-                    task_data.get("review_criteria")
-                )
-            elif task_type == "assemble_deliverable" and "fulfillment_agent" in self.agents:
-                return await self.agents["fulfillment_agent"].assemble_deliverable(
-                    task_data.get("project_requirements", {}),
-                    task_data.get("agent_outputs", [])
-                )
-            else:
+            route = TASK_ROUTES.get(task_type)
+            if route is None:
                 raise ValueError(f"Unknown task type: {task_type}")
+            if route[0] not in self.agents:
+                raise RuntimeError(f"Agent {route[0]} is not initialized")
+            
+            agent_name, params = route
+            return await self.agents[agent_name].submit(
+                task_type,
+                *[task_data.get(key, default) for key, default in params]
+            )
                 
         except Exception as e:
             self.logger.error(f"Error executing task {task_type}: {str(e)}")
             raise
+    
+    def queue_task(self, task_type: str, task_data: dict):
+        """Queue a task to run in the background without waiting for its result"""
+        if task_type not in TASK_ROUTES:
+            raise ValueError(f"Unknown task type: {task_type}")
+        
+        self._ensure_task_workers()
+        self.tasks_queue.put_nowait((task_type, task_data))
+    
+    def _ensure_task_workers(self):
+        self._task_workers = {worker for worker in self._task_workers if not worker.done()}
+        while len(self._task_workers) < TASK_WORKERS:
+            self._task_workers.add(asyncio.create_task(self._task_worker(), name="task_worker"))
+    
+    async def _task_worker(self):
+        while True:
+            task_type, task_data = await self.tasks_queue.get()
+            try:
+                await self.execute_task(task_type, task_data)
+            except Exception:
+                pass  # already logged by execute_task
+            finally:
+                self.tasks_queue.task_done()
 
 # Global orchestrator instance
 orchestrator = AgentOrchestrator()
 
 async def main():
     """Main function to start the orchestrator"""
+    executor.install()
     try:
         await orchestrator.start_all_agents()
     except KeyboardInterrupt:
@@ -227,4 +230,9 @@ async def main():
         logging.error(f"Orchestrator error: {str(e)}")
 
 if __name__ == "__main__":
+    # uvloop (pip install uvloop) drives the agents when installed; it has no
+    # Windows build, so the default asyncio loop is used there
+    if importlib.util.find_spec("uvloop") is not None:
+        import uvloop
+        uvloop.install()
     asyncio.run(main())
\ No newline at end of file